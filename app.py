@@ -1,9 +1,16 @@
 import streamlit as st
 import math
+import time
+from datetime import timedelta
 import concurrent.futures
-from config import FEEDS_BY_REGION, ALL_SOURCES_FLAT, AFRICAN_COUNTRIES, ITEMS_PER_PAGE
-from services import fetch_feed_data, generate_single_post, generate_newsletter, fetch_all_feeds
-from storage import load_favorites, save_favorites, load_saved_stories, save_saved_stories
+from config import FEEDS_BY_REGION, ALL_SOURCES_FLAT, AFRICAN_COUNTRIES, ITEMS_PER_PAGE, POLL_INTERVAL, DEFAULT_USER, INLINE_PARSE_WORKERS
+from services import fetch_feed_data, generate_single_post, generate_newsletter, fetch_all_feeds, stream_single_post, draft_posts
+from storage import load_favorites, save_favorites, load_saved_stories, save_story, remove_story
+import article_store
+import image_cache
+import pipeline
+import warmup
+from view import story_view
 
 # --- CONFIGURATION ---
 st.set_page_config(
@@ -12,6 +19,8 @@ st.set_page_config(
     page_icon="🌍",
     initial_sidebar_state="expanded"
 )
+# Inline scans only; with a poller running this process does not parse at all
+pipeline.configure(INLINE_PARSE_WORKERS)
 
 # --- CUSTOM CSS ---
 st.markdown("""
@@ -33,6 +42,8 @@ st.markdown("""
     .badge-pos { background-color: #1b4d3e; color: #4ade80; padding: 2px 8px; border-radius: 4px; font-size: 0.8em; font-weight: bold; }
     .badge-neg { background-color: #4d1b1b; color: #f87171; padding: 2px 8px; border-radius: 4px; font-size: 0.8em; font-weight: bold; }
     .badge-neu { background-color: #333; color: #ccc; padding: 2px 8px; border-radius: 4px; font-size: 0.8em; font-weight: bold; }
+    .scan-badge { display: inline-block; margin: 0 4px 4px 0; padding: 1px 6px; border-radius: 4px; font-size: 0.75em; background-color: #262730; color: #ccc; }
+    .scan-failed { background-color: #4d1b1b; color: #f87171; }
 
     /* Headers */
     .sidebar-region-header {
@@ -57,22 +68,170 @@ if 'generated_copy' not in st.session_state:
     st.session_state.generated_copy = {}
 if 'current_page' not in st.session_state:
     st.session_state.current_page = 0
+if 'user' not in st.session_state:
+    st.session_state.user = st.query_params.get("user", DEFAULT_USER)  # Saved stories/favorites namespace
 if 'db_favorites' not in st.session_state:
-    st.session_state.db_favorites = load_favorites()
+    st.session_state.db_favorites = load_favorites(st.session_state.user)
 if 'saved_stories_db' not in st.session_state:
-    st.session_state.saved_stories_db = load_saved_stories()
+    st.session_state.saved_stories_db = load_saved_stories(st.session_state.user)
 
 # --- CALLBACKS ---
 def update_favorites():
-    save_favorites(st.session_state.fav_selection)
+    save_favorites(st.session_state.fav_selection, st.session_state.user)
 
 def toggle_save(story):
-    link = story['link']
+    link = story.link
     if link in st.session_state.saved_stories_db:
         del st.session_state.saved_stories_db[link]
+        remove_story(link, st.session_state.user)
     else:
         st.session_state.saved_stories_db[link] = story
-    save_saved_stories(st.session_state.saved_stories_db)
+        save_story(story, st.session_state.user)
+
+def toggle_brief(story):
+    queue = st.session_state.newsletter_queue
+    if story.link in queue:
+        del queue[story.link]
+    else:
+        queue[story.link] = story
+
+def turn_page(step):
+    st.session_state.current_page += step
+
+# --- LIVE SCAN ---
+# Sources are fetched concurrently and each one's stories are archived as it
+# lands, so the top page can be redrawn from the store after every source:
+# the first headlines appear when the fastest feed answers, not the slowest.
+SCAN_ICONS = {'pending': "⏳", 'ok': "✅", 'empty': "⚪", 'error': "❌", 'budget_exceeded': "⌛", 'deadline': "⌛"}
+SCAN_FAILED = {'error', 'budget_exceeded', 'deadline'}
+
+def scan_badges(statuses):
+    badges = []
+    for name, s in sorted(statuses.items()):
+        css = "scan-badge scan-failed" if s['status'] in SCAN_FAILED else "scan-badge"
+        count = f" ({s['count']})" if s.get('count') else ""
+        badges.append(f"<span class='{css}' title='{s['status']}'>{SCAN_ICONS.get(s['status'], '?')} {name}{count}</span>")
+    return "".join(badges)
+
+def live_scan(unique_feeds, view_args):
+    """Fetch all feeds, redrawing per-source badges and a preview of the top page as each one completes."""
+    statuses = {name: {'status': 'pending'} for name, _ in unique_feeds}
+    progress, badges, preview = st.empty(), st.empty(), st.empty()
+    shown = None
+    for done, (name, _, status) in enumerate(fetch_all_feeds(unique_feeds, stream=True), 1):
+        statuses[name] = status
+        progress.caption(f"Scanning sources... {done}/{len(unique_feeds)}")
+        badges.markdown(scan_badges(statuses), unsafe_allow_html=True)
+        top = story_view(*view_args).page(0)
+        if [s.link for s in top] != shown:
+            shown = [s.link for s in top]
+            # Read-only cards: the interactive list (with its widgets) is drawn once the scan ends
+            with preview.container():
+                for story in top:
+                    st.markdown(f"**{story.source}** • <span style='color:#AAA; font-size:0.9em'>{story.relative_time}</span>  \n"
+                                f"[{story.title}]({story.link})", unsafe_allow_html=True)
+    progress.empty(), badges.empty(), preview.empty()
+    return statuses
+
+# --- STORY LIST ---
+# Fragments: paging reruns only the list, and a card's buttons rerun only that
+# card (state changes happen in on_click callbacks, before the rerun). A full
+# rerun happens only when a sidebar section has to appear or disappear (first
+# story queued or saved, last one removed).
+@st.fragment
+def story_card(story, gemini_key, thumbnail=None, snippet=None, cluster_size=1):
+    with st.container():
+        c1, c2 = st.columns([1, 3])
+        with c1:
+            # Local thumbnail when it is ready, else the publisher's original
+            if thumbnail or story.image: st.image(thumbnail or story.image, width="stretch")
+            else: st.markdown("""<div class="img-placeholder">📷 No Image</div>""", unsafe_allow_html=True)
+        
+        with c2:
+            st.markdown(
+                f"<span class='{story.sentiment_class}'>{story.sentiment_label}</span> "
+                f"**{story.source}** • "
+                f"<span style='color:#AAA; font-size:0.9em'>{story.relative_time}</span>"
+                + (f" <span style='color:#AAA; font-size:0.9em'>• +{cluster_size - 1} similar</span>" if cluster_size > 1 else ""), 
+                unsafe_allow_html=True
+            )
+            st.subheader(f"[{story.title}]({story.link})")
+            if snippet: st.markdown(f"<span style='color:#B0B0B0'>{snippet}</span>", unsafe_allow_html=True)
+            elif len(story.summary) > 5: st.markdown(f"<span style='color:#B0B0B0'>{story.summary[:200]}...</span>", unsafe_allow_html=True)
+            
+            st.write("") 
+            # Use small, fixed-width-ish columns to pack buttons closer
+            c_read, c_brief, c_draft, c_save = st.columns([0.8, 1.2, 1.1, 0.9])
+            
+            with c_read: 
+                st.link_button("🔗 Read", story.link)
+            
+            with c_brief:
+                queue = st.session_state.newsletter_queue
+                if story.link in queue:
+                     if st.button("❌ Remove", key=f"rem_{story.link}", on_click=toggle_brief, args=(story,)) and not queue:
+                         st.rerun()
+                else:
+                     if st.button("📝 Add to Brief", key=f"add_{story.link}", on_click=toggle_brief, args=(story,)) and len(queue) == 1:
+                         st.rerun()
+            
+            with c_draft:
+                draft_clicked = st.button("✨ Draft Post", key=f"draft_{story.link}")
+            
+            with c_save:
+                saved = st.session_state.saved_stories_db
+                save_btn_label = "✅ Saved" if story.link in saved else "💾 Save"
+                if st.button(save_btn_label, key=f"save_{story.link}", on_click=toggle_save, args=(story,)) and len(saved) == (1 if story.link in saved else 0):
+                    st.rerun()
+
+            if draft_clicked:
+                if not gemini_key: st.error("Add API Key!")
+                else:
+                    # Stream the caption in as it is written (instant when cached)
+                    try:
+                        st.session_state.generated_copy[story.link] = st.write_stream(stream_single_post(gemini_key, story))
+                    except Exception as e:
+                        st.error(f"Error: {e}")
+            elif story.link in st.session_state.generated_copy:
+                st.code(st.session_state.generated_copy[story.link], language="markdown")
+        st.divider()
+
+@st.fragment
+def story_list(view, gemini_key):
+    # 1. Calculate Pages
+    total_pages = math.ceil(view.total / ITEMS_PER_PAGE)
+    
+    # 2. Safety Check
+    if st.session_state.current_page >= total_pages:
+        st.session_state.current_page = 0
+        
+    start_idx = st.session_state.current_page * ITEMS_PER_PAGE
+    end_idx = start_idx + ITEMS_PER_PAGE
+    
+    # 3. Display Info
+    st.caption(f"Showing {start_idx+1}-{min(end_idx, view.total)} of {view.total} stories")
+    
+    # 4. Render Stories (only this page is fetched), with cached thumbnails
+    page_stories = view.page(st.session_state.current_page)
+    thumbs = image_cache.thumbnails(page_stories)
+    for story in page_stories:
+        story_card(story, gemini_key, thumbs.get(story.image), **view.extras.get(story.link, {}))
+    if st.session_state.current_page < total_pages - 1:
+        image_cache.prefetch(view.page(st.session_state.current_page + 1))
+
+    # 5. PAGINATION CONTROLS
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    
+    with col_prev:
+        if st.session_state.current_page > 0:
+            st.button("⬅️ Previous", on_click=turn_page, args=(-1,))
+    
+    with col_info:
+        st.markdown(f"<div style='text-align: center; color: #888; padding-top: 5px;'>Page {st.session_state.current_page + 1} of {total_pages}</div>", unsafe_allow_html=True)
+        
+    with col_next:
+        if st.session_state.current_page < total_pages - 1:
+            st.button("Next ➡️", on_click=turn_page, args=(1,))
 
 # --- SIDEBAR ---
 with st.sidebar:
@@ -112,7 +271,7 @@ with st.sidebar:
     if st.session_state.saved_stories_db:
         with st.expander("View Saved Collection"):
             for link, s in list(st.session_state.saved_stories_db.items()):
-                st.markdown(f"**[{s['title']}]({s['link']})**")
+                st.markdown(f"**[{s.title}]({s.link})**")
                 c_del, c_copy = st.columns([1, 1])
                 with c_del:
                     if st.button("🗑️", key=f"del_save_{link}"):
@@ -158,9 +317,15 @@ with st.sidebar:
             else:
                 with st.spinner("Writing..."):
                     st.session_state['newsletter_result'] = generate_newsletter(gemini_key, list(st.session_state.newsletter_queue.values()))
+        if st.button("✨ Draft Posts for Queue"):
+            if not gemini_key: st.error("Need API Key!")
+            else:
+                with st.spinner(f"Drafting {len(st.session_state.newsletter_queue)} posts..."):
+                    st.session_state.generated_copy.update(draft_posts(gemini_key, list(st.session_state.newsletter_queue.values())))
 
     if st.button("🔄 Refresh Radar", type="primary"):
-        st.cache_data.clear()
+        fetch_feed_data.clear()
+        st.session_state.pop('last_scan', None)
         st.session_state.current_page = 0 # Reset page on refresh
         st.rerun()
 
@@ -178,145 +343,49 @@ if 'newsletter_result' in st.session_state:
 
 # --- SEARCH ---
 with st.container():
-    c1, c2 = st.columns([2, 1])
+    c1, c2, c3 = st.columns([2, 1, 1])
     with c1:
         # Reset page if search changes
-        search_query = st.text_input("🔍 Search Keyword", placeholder="e.g. Coup, Gold, Cotton...")
+        search_query = st.text_input("🔍 Search Keyword", placeholder='e.g. Coup, Gold*, "cotton exports"...')
     with c2:
         selected_countries = st.multiselect("🏳️ Filter by Country", options=AFRICAN_COUNTRIES)
+    with c3:
+        date_range = st.date_input("📅 Date Range", value=[], format="DD/MM/YYYY")
+    collapse_duplicates = st.checkbox("🧩 Collapse duplicate stories", value=True, help="Show a story syndicated by several sources once")
+
+# Date range -> [since, until) timestamps; a single picked day means just that day
+since = until = None
+if date_range:
+    since = time.mktime(date_range[0].timetuple())
+    until = time.mktime((date_range[-1] + timedelta(days=1)).timetuple())
 
 # --- FEED LOGIC ---
 if not selected_feeds:
     st.info("👈 Select sources in the sidebar.")
 else:
-    all_stories = []
     unique_feeds = list(set(selected_feeds))
     
-    with st.spinner(f'Scanning {len(unique_feeds)} sources...'):
-        # Using the modularized fetch function
-        all_stories = fetch_all_feeds(unique_feeds)
-
-    # Deduplicate
-    seen_urls = set()
-    unique_stories = []
-    for story in all_stories:
-        if story['link'] not in seen_urls:
-            unique_stories.append(story)
-            seen_urls.add(story['link'])
-    all_stories = unique_stories
+    # No background poller (poller.py): fetch inline, but only when the selection
+    # changed or the feed cache expired, not on every rerun
+    scan_key = tuple(sorted(unique_feeds))
+    last_scan = st.session_state.get('last_scan')
+    # Dedup (by link), filter, sort and paginate as cached, indexed store queries
+    view_args = ([name for name, _ in unique_feeds], search_query, selected_countries, since, until, collapse_duplicates)
+    if not article_store.poller_alive() and (not last_scan or last_scan[0] != scan_key or time.time() - last_scan[1] > POLL_INTERVAL):
+        st.session_state.scan_status = live_scan(unique_feeds, view_args)
+        st.session_state.last_scan = (scan_key, time.time())
 
-    # Filter
-    filtered_stories = []
-    if not search_query and not selected_countries:
-        filtered_stories = all_stories
-    else:
-        for story in all_stories:
-            match_keyword = True
-            match_country = True
-            if search_query:
-                query = search_query.lower()
-                if query not in story['title'].lower() and query not in story['summary'].lower(): match_keyword = False
-            if selected_countries:
-                found_country = False
-                for country in selected_countries:
-                    c_lower = country.lower()
-                    if (c_lower in story['title'].lower() or c_lower in story['summary'].lower() or c_lower in story['source'].lower()):
-                        found_country = True
-                        break
-                match_country = found_country
-            if match_keyword and match_country: filtered_stories.append(story)
+    failed = {name: s for name, s in st.session_state.get('scan_status', {}).items() if s['status'] in SCAN_FAILED and name in dict(unique_feeds)}
+    if failed:
+        st.markdown("<span style='color:#AAA; font-size:0.9em'>Not refreshed:</span> " + scan_badges(failed), unsafe_allow_html=True)
 
-    filtered_stories = sorted(filtered_stories, key=lambda x: x['timestamp'], reverse=True)
-
-    # --- PAGINATION LOGIC ---
-    if not filtered_stories:
+    view = story_view(*view_args)
+    if not view.total:
         st.warning("No stories found.")
     else:
-        # 1. Calculate Pages
-        total_stories = len(filtered_stories)
-        total_pages = math.ceil(total_stories / ITEMS_PER_PAGE)
-        
-        # 2. Safety Check
-        if st.session_state.current_page >= total_pages:
-            st.session_state.current_page = 0
-            
-        start_idx = st.session_state.current_page * ITEMS_PER_PAGE
-        end_idx = start_idx + ITEMS_PER_PAGE
-        
-        # 3. Slice the data
-        page_stories = filtered_stories[start_idx:end_idx]
-        
-        # 4. Display Info
-        st.caption(f"Showing {start_idx+1}-{min(end_idx, total_stories)} of {total_stories} stories")
-        
-        # 5. Render Stories
-        for story in page_stories:
-            with st.container():
-                c1, c2 = st.columns([1, 3])
-                with c1:
-                    if story['image']: st.image(story['image'], width="stretch")
-                    else: st.markdown("""<div class="img-placeholder">📷 No Image</div>""", unsafe_allow_html=True)
-                
-                with c2:
-                    st.markdown(
-                        f"<span class='{story['sentiment_class']}'>{story['sentiment_label']}</span> "
-                        f"**{story['source']}** • "
-                        f"<span style='color:#AAA; font-size:0.9em'>{story['relative_time']}</span>", 
-                        unsafe_allow_html=True
-                    )
-                    st.subheader(f"[{story['title']}]({story['link']})")
-                    if len(story['summary']) > 5: st.markdown(f"<span style='color:#B0B0B0'>{story['summary'][:200]}...</span>", unsafe_allow_html=True)
-                    
-                    st.write("") 
-                    # Use small, fixed-width-ish columns to pack buttons closer
-                    c_read, c_brief, c_draft, c_save = st.columns([0.8, 1.2, 1.1, 0.9])
-                    
-                    with c_read: 
-                        st.link_button("🔗 Read", story['link'])
-                    
-                    with c_brief:
-                        is_in_queue = story['link'] in st.session_state.newsletter_queue
-                        if is_in_queue:
-                             if st.button("❌ Remove", key=f"rem_{story['link']}"):
-                                 del st.session_state.newsletter_queue[story['link']]
-                                 st.rerun()
-                        else:
-                             if st.button("📝 Add to Brief", key=f"add_{story['link']}"):
-                                 st.session_state.newsletter_queue[story['link']] = story
-                                 st.rerun()
-                    
-                    with c_draft:
-                        if st.button("✨ Draft Post", key=f"draft_{story['link']}"):
-                            if not gemini_key: st.error("Add API Key!")
-                            else:
-                                with st.spinner("Writing..."):
-                                    st.session_state.generated_copy[story['link']] = generate_single_post(gemini_key, story)
-                    
-                    with c_save:
-                        is_saved = story['link'] in st.session_state.saved_stories_db
-                        save_btn_label = "✅ Saved" if is_saved else "💾 Save"
-                        if st.button(save_btn_label, key=f"save_{story['link']}"):
-                            toggle_save(story)
-                            st.rerun()
+        story_list(view, gemini_key)
 
-                    if story['link'] in st.session_state.generated_copy:
-                        st.code(st.session_state.generated_copy[story['link']], language="markdown")
-                st.divider()
-
-        # 6. PAGINATION CONTROLS
-        col_prev, col_info, col_next = st.columns([1, 2, 1])
-        
-        with col_prev:
-            if st.session_state.current_page > 0:
-                if st.button("⬅️ Previous"):
-                    st.session_state.current_page -= 1
-                    st.rerun()
-        
-        with col_info:
-            st.markdown(f"<div style='text-align: center; color: #888; padding-top: 5px;'>Page {st.session_state.current_page + 1} of {total_pages}</div>", unsafe_allow_html=True)
-            
-        with col_next:
-            if st.session_state.current_page < total_pages - 1:
-                if st.button("Next ➡️"):
-                    st.session_state.current_page += 1
-                    st.rerun()
\ No newline at end of file
+# --- WARM-UP ---
+# The page has been sent: load the lazily imported dependencies (Gemini SDK,
+# scraper, Pillow, sentiment lexicon) in the background before they are needed
+warmup.start()
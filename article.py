@@ -0,0 +1,54 @@
+import threading
+import time
+import weakref
+from dataclasses import dataclass, fields
+from utils import relative_time_from_ts
+
+# Compact, immutable story record for everything the UI keeps: view pages,
+# the scan cache, newsletter queues and saved stories. Only raw fields are
+# stored (slots, no per-instance dict); the display strings are derived from
+# the timestamp at render time, so they never go stale in a cache. Records
+# are interned by link, so every session holding a story shares one object.
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class Article:
+    link: str
+    title: str
+    summary: str
+    source: str
+    timestamp: float = 0       # 0: the feed gave no date
+    image: str | None = None
+    sentiment_class: str | None = None
+    sentiment_label: str | None = None
+    cluster_id: str | None = None
+
+    @property
+    def published_display(self):
+        return time.strftime("%d %b • %H:%M", time.localtime(self.timestamp)) if self.timestamp else "Recent"
+
+    @property
+    def relative_time(self):
+        return relative_time_from_ts(self.timestamp)
+
+    def to_dict(self):
+        """Raw fields as a plain dict (JSON storage)."""
+        return {name: getattr(self, name) for name in FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Shared Article for an article dict, store row or stored JSON; extra keys are ignored."""
+        return intern(cls(**{name: data[name] for name in FIELDS if name in data.keys()}))
+
+FIELDS = tuple(f.name for f in fields(Article))
+
+_lock = threading.Lock()
+_interned = weakref.WeakValueDictionary()  # link -> Article still referenced somewhere
+
+def intern(article):
+    """The live Article equal to this one if there is one, else this one (now shared)."""
+    with _lock:
+        existing = _interned.get(article.link)
+        if existing == article:
+            return existing
+        _interned[article.link] = article
+        return article
@@ -0,0 +1,342 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from clustering import ClusterIndex, SIMILARITY_THRESHOLD, article_signature, band_keys, cluster_id_for, similarity
+from config import ARTICLE_DB, POLLER_HEARTBEAT, POLLER_STALE_AFTER, CLUSTER_WINDOW
+from tagger import tag_article
+
+# SQLite archive of every ingested article. Written by the ingestion path
+# (load_feed_articles, via the poller or an inline fetch) and read by the
+# app as indexed, paginated queries instead of Python loops over every story.
+# An external-content FTS5 index over title/summary, kept in sync by triggers,
+# backs the keyword search; ingest-time country tags back the country filter.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    link TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    source TEXT NOT NULL,
+    timestamp REAL NOT NULL DEFAULT 0,
+    image TEXT,
+    sentiment_class TEXT,
+    sentiment_label TEXT,
+    cluster_id TEXT,
+    signature BLOB,
+    first_seen REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_timestamp ON articles (timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_source_timestamp ON articles (source, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_sentiment ON articles (sentiment_class, timestamp DESC);
+CREATE TABLE IF NOT EXISTS article_lsh (
+    bucket TEXT NOT NULL,
+    link TEXT NOT NULL,
+    PRIMARY KEY (bucket, link)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_article_lsh_link ON article_lsh (link);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary,
+    content='articles', content_rowid='rowid',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, summary) VALUES (new.rowid, new.title, new.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, summary) VALUES ('delete', old.rowid, old.title, old.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, summary ON articles
+WHEN old.title IS NOT new.title OR old.summary IS NOT new.summary BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, summary) VALUES ('delete', old.rowid, old.title, old.summary);
+    INSERT INTO articles_fts (rowid, title, summary) VALUES (new.rowid, new.title, new.summary);
+END;
+CREATE TABLE IF NOT EXISTS article_countries (
+    country TEXT NOT NULL,
+    link TEXT NOT NULL,
+    PRIMARY KEY (country, link)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_article_countries_link ON article_countries (link);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+COUNTRY_TAGS_VERSION = "2"  # Bump when tagger.py matches differently: stored tags are redone on open
+
+COLUMNS = ["link", "title", "summary", "source", "timestamp", "image", "sentiment_class", "sentiment_label", "cluster_id"]
+
+_lock = threading.Lock()
+_conn = None
+_writes = 0  # Bumped on every local write; PRAGMA data_version covers other processes
+
+def _drop_columns(conn, existing, columns):
+    """Drop columns this version no longer writes (kept, and ignored, on SQLite < 3.35)."""
+    for column in columns:
+        if column in existing:
+            try:
+                conn.execute(f"ALTER TABLE articles DROP COLUMN {column}")
+            except sqlite3.OperationalError as e:
+                print(f"[Store] Keeping unused column {column}: {e}")
+
+def _migrate(conn):
+    """Create the schema and bring archives written by older versions up to date."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(articles)")}
+    if existing:
+        for column, decl in [("cluster_id", "TEXT"), ("signature", "BLOB")]:
+            if column not in existing:
+                conn.execute(f"ALTER TABLE articles ADD COLUMN {column} {decl}")
+        _drop_columns(conn, existing, ["published_display", "canonical"])
+    conn.executescript(SCHEMA)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_cluster ON articles (cluster_id)")
+    # Archives created before the FTS index existed: index what is already there
+    if conn.execute("SELECT value FROM meta WHERE key = 'fts_built'").fetchone() is None:
+        with conn:
+            conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fts_built', '1')")
+    # ...and before country tags were stored, or by an older tagger: tag them once
+    if conn.execute("SELECT value FROM meta WHERE key = 'countries_tagged'").fetchone() != (COUNTRY_TAGS_VERSION,):
+        rows = conn.execute("SELECT link, title, summary, source FROM articles").fetchall()
+        with conn:
+            _write_countries(conn, [dict(r) for r in rows])
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('countries_tagged', ?)", (COUNTRY_TAGS_VERSION,))
+
+def _get_conn():
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(ARTICLE_DB) or ".", exist_ok=True)
+        conn = sqlite3.connect(ARTICLE_DB, check_same_thread=False, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _migrate(conn)
+        _conn = conn
+    return _conn
+
+def _to_story(row):
+    return dict(row)
+
+# --- WRITE ---
+def _write_countries(conn, articles):
+    # Articles from the ingestion path arrive tagged; tag anything else here
+    tagged = [a if 'countries' in a else tag_article(dict(a)) for a in articles]
+    conn.executemany("DELETE FROM article_countries WHERE link = ?", [(a['link'],) for a in tagged])
+    conn.executemany(
+        "INSERT OR IGNORE INTO article_countries (country, link) VALUES (?, ?)",
+        [(country, a['link']) for a in tagged for country in a['countries']],
+    )
+
+def _write_lsh(conn, articles):
+    signed = [a for a in articles if a.get('signature') is not None]
+    conn.executemany("DELETE FROM article_lsh WHERE link = ?", [(a['link'],) for a in signed])
+    conn.executemany(
+        "INSERT OR IGNORE INTO article_lsh (bucket, link) VALUES (?, ?)",
+        [(key, a['link']) for a in signed for key in band_keys(a['signature'])],
+    )
+
+def _upsert(conn, articles):
+    global _writes
+    now = time.time()
+    rows = []
+    for a in articles:
+        if not a.get('cluster_id'):
+            a['cluster_id'] = cluster_id_for(a['link'])
+        sig = a.get('signature')
+        rows.append(tuple(a.get(c) for c in COLUMNS) + (sig.tobytes() if sig is not None else None, now, now))
+    placeholders = ", ".join("?" * (len(COLUMNS) + 3))
+    updates = ", ".join(f"{c} = excluded.{c}" for c in COLUMNS[1:])
+    with conn:
+        conn.executemany(
+            f"INSERT INTO articles ({', '.join(COLUMNS)}, signature, first_seen, updated) VALUES ({placeholders}) "
+            f"ON CONFLICT(link) DO UPDATE SET {updates}, signature = COALESCE(excluded.signature, signature), updated = excluded.updated",
+            rows,
+        )
+        _write_countries(conn, articles)
+        _write_lsh(conn, articles)
+    _writes += 1
+
+def upsert_articles(articles):
+    """Insert or refresh a batch of article dicts in one transaction."""
+    if not articles:
+        return
+    with _lock:
+        _upsert(_get_conn(), articles)
+
+# --- NEAR-DUPLICATE CLUSTERS ---
+MAX_CANDIDATES = 200  # Bound the work for pathological buckets (boilerplate summaries)
+
+def _stored_match(conn, sig, article):
+    """Best archived near-duplicate of an article (within CLUSTER_WINDOW), or None."""
+    keys = band_keys(sig)
+    ts = article.get('timestamp') or time.time()
+    rows = conn.execute(
+        f"SELECT a.link, a.cluster_id, a.signature, a.sentiment_class, a.sentiment_label FROM articles a "
+        f"WHERE a.link IN (SELECT link FROM article_lsh WHERE bucket IN ({', '.join('?' * len(keys))})) "
+        f"AND a.link != ? AND a.timestamp BETWEEN ? AND ? ORDER BY a.timestamp DESC LIMIT {MAX_CANDIDATES}",
+        keys + [article['link'], ts - CLUSTER_WINDOW, ts + CLUSTER_WINDOW],
+    ).fetchall()
+    best, best_sim = None, SIMILARITY_THRESHOLD
+    for row in rows:
+        if row['signature'] is None:
+            continue
+        sim = similarity(sig, array("Q", row['signature']))
+        if sim >= best_sim:
+            best, best_sim = dict(row), sim
+    return best
+
+def _assign_clusters(conn, articles):
+    """Attach each article to an archived or same-batch near-duplicate, reusing its sentiment."""
+    batch = ClusterIndex()
+    for article in sorted(articles, key=lambda a: a.get('timestamp') or 0):
+        if 'signature' not in article:  # Usually computed by the parse stage (pipeline.py)
+            article['signature'] = article_signature(article)
+        sig = article['signature']
+        match = None
+        if sig is not None:
+            match = _stored_match(conn, sig, article) or batch.match(sig)
+        if match:
+            article['cluster_id'] = match['cluster_id']
+            if match.get('sentiment_class'):
+                article['sentiment_class'] = match['sentiment_class']
+                article['sentiment_label'] = match['sentiment_label']
+        else:
+            article['cluster_id'] = cluster_id_for(article['link'])
+        if sig is not None:
+            batch.add(sig, article)
+
+def ingest_articles(articles, fresh, score_fn):
+    """
+    Ingest one feed refresh: cluster the fresh (new/changed) articles against
+    the archive, run score_fn only on those without a scored near-duplicate,
+    then upsert everything. Scoring (the costly step) runs outside the store
+    lock, so other feeds' ingests and UI reads are not held up by it.
+    """
+    with _lock:
+        _assign_clusters(_get_conn(), fresh)
+    score_fn([a for a in fresh if not a.get('sentiment_class')])
+    if articles:
+        with _lock:
+            _upsert(_get_conn(), articles)
+
+# --- FULL-TEXT SEARCH ---
+_FTS_TOKEN_RE = re.compile(r'"([^"]+)"|(\S+)')
+_FTS_WORD_RE = re.compile(r"[\w']+")
+
+def build_match(query):
+    """
+    Turn the keyword box into an FTS5 MATCH expression: "quoted phrases" stay
+    phrases, a trailing * makes a prefix query, everything else is ANDed words.
+    Returns "" if nothing searchable is left.
+    """
+    terms = []
+    for phrase, word in _FTS_TOKEN_RE.findall(query or ""):
+        if phrase:
+            words = _FTS_WORD_RE.findall(phrase)
+            if words: terms.append('"' + " ".join(words) + '"')
+        else:
+            words = _FTS_WORD_RE.findall(word)
+            if not words: continue
+            prefix = "*" if word.endswith("*") and len(words) == 1 else ""
+            terms.append('"' + " ".join(words) + '"' + prefix)
+    return " ".join(terms)
+
+# --- READ ---
+def _where(sources, countries=None, since=None, until=None):
+    clauses, params = [], []
+    if sources is not None:
+        clauses.append(f"a.source IN ({', '.join('?' * len(sources))})")
+        params.extend(sources)
+    if countries:
+        clauses.append(f"a.link IN (SELECT link FROM article_countries WHERE country IN ({', '.join('?' * len(countries))}))")
+        params.extend(countries)
+    if since is not None:
+        clauses.append("a.timestamp >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("a.timestamp < ?")
+        params.append(until)
+    return clauses, params
+
+def _select(sources, search, countries, since, until, join=""):
+    """FROM/WHERE for a story query, joined to the FTS index when there is a search."""
+    clauses, params = _where(sources, countries, since, until)
+    match = build_match(search)
+    if match:
+        sql = f"FROM articles_fts JOIN articles a ON a.rowid = articles_fts.rowid {join} WHERE articles_fts MATCH ?"
+        params = [match] + params
+        if clauses: sql += " AND " + " AND ".join(clauses)
+    else:
+        sql = f"FROM articles a {join}" + ((" WHERE " + " AND ".join(clauses)) if clauses else "")
+    return sql, params, bool(match)
+
+def query_articles(sources=None, search=None, countries=None, since=None, until=None, limit=None, offset=0, collapse=False):
+    """
+    Page of stories matching the filters (sources=None means all). Newest first,
+    or BM25-ranked with a highlighted 'snippet' when there is a search query.
+    With collapse=True each near-duplicate cluster appears once (its earliest
+    matching story) with 'cluster_size' set.
+    """
+    columns = ", ".join(f"a.{c}" for c in COLUMNS)
+    prefix, params = "", []
+    join = ""
+    if collapse:
+        # Pick each cluster's representative among the matches first; FTS functions
+        # cannot run inside window queries, so the outer query joins back to it
+        inner_sql, params, _ = _select(sources, search, countries, since, until)
+        cluster = "COALESCE(a.cluster_id, a.link)"
+        prefix = (f"WITH reps AS (SELECT rid, cluster_size FROM (SELECT a.rowid AS rid, "
+                  f"ROW_NUMBER() OVER (PARTITION BY {cluster} ORDER BY a.timestamp) AS cluster_rank, "
+                  f"COUNT(*) OVER (PARTITION BY {cluster}) AS cluster_size {inner_sql}) WHERE cluster_rank = 1) ")
+        join = "JOIN reps ON reps.rid = a.rowid"
+        columns += ", reps.cluster_size"
+    sql, outer_params, searching = _select(sources, search, countries, since, until, join)
+    params += outer_params
+    if searching:
+        columns += ", snippet(articles_fts, 1, '<mark>', '</mark>', '…', 24) AS snippet"
+        sql = f"{prefix}SELECT {columns} {sql} ORDER BY bm25(articles_fts, 10.0, 1.0), a.timestamp DESC"
+    else:
+        sql = f"{prefix}SELECT {columns} {sql} ORDER BY a.timestamp DESC"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+    with _lock:
+        rows = _get_conn().execute(sql, params).fetchall()
+    return [_to_story(r) for r in rows]
+
+def count_articles(sources=None, search=None, countries=None, since=None, until=None, collapse=False):
+    sql, params, _ = _select(sources, search, countries, since, until)
+    counted = "DISTINCT COALESCE(a.cluster_id, a.link)" if collapse else "*"
+    with _lock:
+        return _get_conn().execute(f"SELECT COUNT({counted}) {sql}", params).fetchone()[0]
+
+def store_version():
+    """Changes whenever articles are written, here or by another process (the poller)."""
+    with _lock:
+        return _get_conn().execute("PRAGMA data_version").fetchone()[0], _writes
+
+# --- POLLER HEARTBEAT ---
+# A small file next to the poller lock rather than a row in the archive: a
+# write to the DB bumps data_version and would invalidate every cached view.
+def write_heartbeat(info=None):
+    os.makedirs(os.path.dirname(POLLER_HEARTBEAT), exist_ok=True)
+    tmp_path = f"{POLLER_HEARTBEAT}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({'time': time.time(), 'pid': os.getpid(), **(info or {})}, f)
+    os.replace(tmp_path, POLLER_HEARTBEAT)
+
+def read_heartbeat():
+    try:
+        with open(POLLER_HEARTBEAT, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def poller_alive():
+    """True when a poller has checked in recently enough for the UI to trust the store."""
+    heartbeat = read_heartbeat()
+    return bool(heartbeat) and time.time() - heartbeat.get('time', 0) < POLLER_STALE_AFTER
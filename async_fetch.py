@@ -0,0 +1,102 @@
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+from urllib.parse import urlsplit
+from config import SCAN_DEADLINE, FEED_BUDGET, PER_HOST_LIMIT
+
+# Asyncio scan engine: alternative to the plain ThreadPoolExecutor in
+# services.fetch_all_feeds. Each feed runs the blocking fetch in a worker
+# thread, gated by a per-host semaphore and a per-feed latency budget.
+# When the global deadline hits, the scan returns whatever has arrived.
+
+async def _fetch_one(loop, executor, fetch_fn, name, url, host_limits, budget):
+    host = urlsplit(url).hostname or ""
+    started = time.monotonic()
+    limit = host_limits[host]
+    await limit.acquire()
+    # The host slot is held until the fetch itself finishes, not until we stop
+    # waiting for it: an over-budget or cancelled fetch keeps running in its
+    # thread, and releasing early would let more requests pile onto that host
+    future = loop.run_in_executor(executor, fetch_fn, url, name)
+    future.add_done_callback(_release(limit))
+    try:
+        stories = await asyncio.wait_for(asyncio.shield(future), timeout=budget)
+        return stories, {'status': 'ok' if stories else 'empty', 'elapsed': time.monotonic() - started, 'count': len(stories)}
+    except asyncio.TimeoutError:
+        return [], {'status': 'budget_exceeded', 'elapsed': time.monotonic() - started, 'count': 0}
+    except Exception as e:
+        print(f"[Async scan] {name} failed: {e}")
+        return [], {'status': 'error', 'elapsed': time.monotonic() - started, 'count': 0, 'error': str(e)}
+
+def _release(limit):
+    """Done callback for an executor future: free its host slot, and retrieve
+    the result of a fetch nobody awaits any more so it is not logged as lost."""
+    def done(future):
+        limit.release()
+        if not future.cancelled():
+            future.exception()
+    return done
+
+async def scan_feeds_async(unique_feeds, fetch_fn, deadline=SCAN_DEADLINE, budget=FEED_BUDGET, per_host_limit=PER_HOST_LIMIT, on_result=None):
+    """
+    Fetch (name, url) pairs concurrently with fetch_fn(url, name).
+    Returns (stories, statuses) where statuses maps source name to
+    {'status': ok|empty|error|budget_exceeded|deadline, 'elapsed', 'count'}.
+    on_result(name, stories, status), if given, is called as each feed settles.
+    """
+    loop = asyncio.get_running_loop()
+    host_limits = {}
+    for _, url in unique_feeds:
+        host_limits.setdefault(urlsplit(url).hostname or "", asyncio.Semaphore(per_host_limit))
+
+    # Dedicated pool so abandoned (over-budget) fetches never starve the next scan's default executor
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(len(unique_feeds), 1))
+    tasks = {
+        asyncio.create_task(_fetch_one(loop, executor, fetch_fn, name, url, host_limits, budget)): name
+        for name, url in unique_feeds
+    }
+    started = time.monotonic()
+    all_stories, statuses = [], {}
+
+    def settle(name, stories, status):
+        all_stories.extend(stories)
+        statuses[name] = status
+        if on_result:
+            on_result(name, stories, status)
+
+    try:
+        pending = set(tasks)
+        while pending:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                settle(tasks[task], *task.result())
+        for task in pending:
+            task.cancel()
+            settle(tasks[task], [], {'status': 'deadline', 'elapsed': time.monotonic() - started, 'count': 0})
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return all_stories, statuses
+
+def scan_feeds(unique_feeds, fetch_fn, **kwargs):
+    """Synchronous wrapper around scan_feeds_async for use from the Streamlit script."""
+    return asyncio.run(scan_feeds_async(unique_feeds, fetch_fn, **kwargs))
+
+def stream_feeds(unique_feeds, fetch_fn, **kwargs):
+    """Like scan_feeds, but yields (name, stories, status) as each feed settles."""
+    results = queue.Queue()
+    done = object()
+
+    def run():
+        try:
+            scan_feeds(unique_feeds, fetch_fn, on_result=lambda *result: results.put(result), **kwargs)
+        finally:
+            results.put(done)
+
+    threading.Thread(target=run, daemon=True, name="scan-stream").start()
+    while (result := results.get()) is not done:
+        yield result
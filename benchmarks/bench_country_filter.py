@@ -0,0 +1,73 @@
+"""
+Country filter: the old per-rerun substring loop vs ingest-time tags.
+
+    python -m benchmarks.bench_country_filter [--stories 20000] [--countries 3]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("RADAR_CACHE_DIR", tempfile.mkdtemp(prefix="radar-bench-"))
+
+import article_store
+from config import AFRICAN_COUNTRIES, ALL_SOURCES_FLAT, COUNTRY_ALIASES
+from tagger import tag_article
+
+WORDS = "election coup gold cotton drought floods bank minister talks rebels trade budget court port oil".split()
+
+def make_stories(n):
+    rng = random.Random(42)
+    mentions = AFRICAN_COUNTRIES + [a for aliases in COUNTRY_ALIASES.values() for a in aliases]
+    stories = []
+    for i in range(n):
+        title = f"{rng.choice(mentions)} {' '.join(rng.choices(WORDS, k=6))}"
+        summary = " ".join(rng.choices(WORDS, k=30)) + (f" {rng.choice(mentions)}" if i % 3 == 0 else "")
+        stories.append({'link': f"http://bench/{i}", 'title': title, 'summary': summary,
+                        'source': rng.choice(list(ALL_SOURCES_FLAT)), 'timestamp': time.time() - i * 60})
+    return stories
+
+def old_filter(stories, selected_countries):
+    """The pre-tagger loop from app.py."""
+    out = []
+    for story in stories:
+        for country in selected_countries:
+            c_lower = country.lower()
+            if (c_lower in story['title'].lower() or c_lower in story['summary'].lower() or c_lower in story['source'].lower()):
+                out.append(story)
+                break
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stories", type=int, default=20000)
+    parser.add_argument("--countries", type=int, default=3)
+    args = parser.parse_args()
+
+    stories = make_stories(args.stories)
+    selected = random.Random(7).sample(AFRICAN_COUNTRIES, args.countries)
+    print(f"{len(stories)} stories, filtering on {selected}")
+
+    started = time.perf_counter()
+    for story in stories:
+        tag_article(story)
+    print(f"tag at ingest (one-off)     {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    started = time.perf_counter()
+    old = old_filter(stories, selected)
+    print(f"old substring loop          {(time.perf_counter() - started) * 1000:8.1f} ms  {len(old)} matches")
+
+    wanted = set(selected)
+    started = time.perf_counter()
+    new = [s for s in stories if wanted.intersection(s['countries'])]
+    print(f"tag set lookup              {(time.perf_counter() - started) * 1000:8.1f} ms  {len(new)} matches")
+
+    article_store.upsert_articles(stories)
+    started = time.perf_counter()
+    total = article_store.count_articles(None, countries=selected)
+    page = article_store.query_articles(None, countries=selected, limit=10)
+    print(f"indexed store query (page)  {(time.perf_counter() - started) * 1000:8.1f} ms  {total} matches, {len(page)} shown")
+
+if __name__ == "__main__":
+    main()
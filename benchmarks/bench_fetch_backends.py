@@ -0,0 +1,53 @@
+"""
+Compare the thread-pool and asyncio scan backends against a local stub server.
+
+    python -m benchmarks.bench_fetch_backends --feeds 27 --slow 3 --failing 2
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# Keep the benchmark's HTTP cache away from the app's
+os.environ.setdefault("RADAR_CACHE_DIR", tempfile.mkdtemp(prefix="radar-bench-"))
+
+import services
+from benchmarks.stub_server import StubFeedServer, make_rss
+
+def run(backend, unique_feeds, **kwargs):
+    services.fetch_feed_data.clear()
+    started = time.perf_counter()
+    if backend == "async":
+        stories, statuses = services.scan_feeds(unique_feeds, services.fetch_feed_data, **kwargs)
+    else:
+        stories, statuses = services.fetch_all_feeds(unique_feeds, backend="threads"), {}
+    return time.perf_counter() - started, stories, statuses
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feeds", type=int, default=27)
+    parser.add_argument("--slow", type=int, default=3, help="feeds that answer after --slow-delay seconds")
+    parser.add_argument("--slow-delay", type=float, default=8.0)
+    parser.add_argument("--failing", type=int, default=2, help="feeds that return HTTP 500")
+    parser.add_argument("--deadline", type=float, default=3.0)
+    parser.add_argument("--budget", type=float, default=2.0)
+    args = parser.parse_args()
+
+    slugs = [f"feed{i}" for i in range(args.feeds)]
+    delays = {slug: args.slow_delay for slug in slugs[:args.slow]}
+    failures = {slug: 500 for slug in slugs[args.slow:args.slow + args.failing]}
+
+    with StubFeedServer({slug: make_rss(slug) for slug in slugs}, delays=delays, failures=failures) as server:
+        unique_feeds = [(slug, server.url(slug)) for slug in slugs]
+
+        elapsed, stories, _ = run("threads", unique_feeds)
+        print(f"threads: {elapsed:6.2f}s  {len(stories)} stories")
+
+        elapsed, stories, statuses = run("async", unique_feeds, deadline=args.deadline, budget=args.budget)
+        by_status = {}
+        for status in statuses.values():
+            by_status[status['status']] = by_status.get(status['status'], 0) + 1
+        print(f"async:   {elapsed:6.2f}s  {len(stories)} stories  {by_status}")
+
+if __name__ == "__main__":
+    main()
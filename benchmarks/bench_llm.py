@@ -0,0 +1,68 @@
+"""
+Drafting posts for a newsletter queue against a local fake Gemini endpoint.
+
+    python -m benchmarks.bench_llm [--stories 10] [--latency 0.8] [--throttle 2]
+
+Compares the old one-client-per-call serial loop with llm.generate_many
+(shared client, bounded parallelism, retry on the first --throttle 429s),
+the warm response cache, and time to first token when streaming.
+"""
+import argparse
+import dataclasses
+import os
+import tempfile
+import time
+
+os.environ.setdefault("RADAR_CACHE_DIR", tempfile.mkdtemp(prefix="radar-bench-"))
+
+from google import genai
+import llm
+import services
+from article import Article
+from benchmarks.fake_gemini import FakeGemini
+from config import GEMINI_MODEL
+
+def make_stories(n):
+    return [Article(link=f"http://bench/{i}", title=f"Story {i} about the Nile dam talks", source="Bench",
+                    summary=f"Ministers met for round {i} of talks on water sharing.") for i in range(n)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stories", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.8, help="seconds per fake Gemini call")
+    parser.add_argument("--throttle", type=int, default=2, help="answer the first N bulk calls with 429")
+    args = parser.parse_args()
+
+    stories = make_stories(args.stories)
+    with FakeGemini(latency=args.latency) as fake:
+        llm.GEMINI_BASE_URL = fake.base_url
+        http_options = {'base_url': fake.base_url}
+
+        started = time.perf_counter()
+        for story in stories:
+            client = genai.Client(api_key="bench", http_options=http_options)
+            client.models.generate_content(model=GEMINI_MODEL, contents=services.post_prompt(story))
+        print(f"serial, new client per call   {time.perf_counter() - started:6.2f}s")
+
+        fake.throttle_first = fake.calls + args.throttle  # The next N calls get 429
+        llm.LLM_BACKOFF = 0.2
+        started = time.perf_counter()
+        drafts = services.draft_posts("bench", stories)
+        errors = sum(text.startswith("Error") for text in drafts.values())
+        print(f"draft_posts (parallel, cold)  {time.perf_counter() - started:6.2f}s  "
+              f"{errors} errors, {args.throttle} throttled calls retried, peak {fake.max_concurrent} concurrent")
+
+        calls = fake.calls
+        started = time.perf_counter()
+        services.draft_posts("bench", stories)
+        print(f"draft_posts (cached)          {time.perf_counter() - started:6.2f}s  {fake.calls - calls} API calls")
+
+        started = time.perf_counter()
+        chunks = services.stream_single_post("bench", dataclasses.replace(stories[0], title="A new story"))
+        next(chunks)
+        first = time.perf_counter() - started
+        rest = "".join(chunks)
+        print(f"stream: first token {first:.2f}s, full reply {time.perf_counter() - started:.2f}s ({len(rest.split()) + 1} words)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Per-session memory of story records: the old dict records against shared
+Article records.
+
+    python -m benchmarks.bench_memory [--stories 5000] [--sessions 100] [--saved 50] [--queued 20]
+
+A --stories archive spread over 50 sources is held by --sessions concurrent
+sessions, each with its scan results, --saved saved stories (own user
+namespace, picked from the archive) and --queued stories in the newsletter
+queue. Old: st.cache_data hands every call its own unpickled list of
+ingestion dicts, saved stories are JSON-loaded dicts and the queue keeps the
+row dicts it was given. New: one st.cache_resource tuple of Articles shared
+by all sessions, saved stories loaded through storage and queued stories
+taken from the view, all interned. Measured with tracemalloc; "shared" is
+what the cache holds once, "per session" what each session adds on top.
+"""
+import argparse
+import json
+import os
+import pickle
+import random
+import tempfile
+import tracemalloc
+
+os.environ.setdefault("RADAR_USER_DB", os.path.join(tempfile.mkdtemp(prefix="radar-bench-"), "user_data.db"))
+
+import storage
+from article import Article
+from clustering import article_signature, cluster_id_for
+from utils import relative_time_from_ts
+
+storage.LEGACY_FAVORITES_FILE = storage.LEGACY_SAVED_STORIES_FILE = os.environ["RADAR_USER_DB"] + ".none"  # Start empty
+
+SOURCES = [f"Source {i}" for i in range(50)]
+
+def make_article(i):
+    """A story as load_feed_articles returns it (and as the old cache held it)."""
+    timestamp = 1700000000 + i * 60
+    article = {
+        'title': f"Story {i}: ministers agree on the regional power pool",
+        'link': f"http://bench/{i}",
+        'summary': f"Round {i}. Officials said the agreement covers trade, transport and power links, with funding from regional banks.",
+        'published_display': "14 Nov • 22:13",
+        'relative_time': relative_time_from_ts(timestamp),
+        'timestamp': timestamp,
+        'source': SOURCES[i % len(SOURCES)],
+        'image': f"http://bench/img/{i}.jpg",
+        'countries': ["Kenya", "Ethiopia"],
+        'sentiment_class': "sent-pos",
+        'sentiment_label': "Positive",
+        'cluster_id': cluster_id_for(f"http://bench/{i}"),
+    }
+    article['signature'] = article_signature(article)
+    return article
+
+def measure(build):
+    """Bytes still allocated by what build() returns."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return used
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stories", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--saved", type=int, default=50)
+    parser.add_argument("--queued", type=int, default=20)
+    args = parser.parse_args()
+
+    archive = [make_article(i) for i in range(args.stories)]
+    by_source = {name: [a for a in archive if a['source'] == name] for name in SOURCES}
+    rows = [{k: v for k, v in a.items() if k not in ('signature', 'published_display')} for a in archive]  # as the store returns them
+    rng = random.Random(0)
+    saved = [rng.sample(range(args.stories), args.saved) for _ in range(args.sessions)]
+    queued = [rng.sample(range(args.stories), args.queued) for _ in range(args.sessions)]
+    saved_json = [json.dumps({rows[i]['link']: rows[i] for i in picks}) for picks in saved]
+    for user, picks in enumerate(saved):
+        storage.save_saved_stories({rows[i]['link']: Article.from_dict(rows[i]) for i in picks}, f"u{user}")
+
+    # Old: the cache keeps pickles and unpickles a fresh list for every call
+    pickled = {}
+    old_shared = measure(lambda: pickled.update({name: pickle.dumps(stories) for name, stories in by_source.items()}))
+    old_sessions = measure(lambda: [
+        ([pickle.loads(pickled[name]) for name in SOURCES],
+         json.loads(saved_json[user]),
+         {rows[i]['link']: dict(rows[i]) for i in queued[user]})
+        for user in range(args.sessions)])
+
+    # New: one tuple of Articles per source, shared; sessions hold references
+    shared = {}
+    # Built from fresh copies, as fetch_feed_data builds them from a new load_feed_articles result
+    new_shared = measure(lambda: shared.update({name: tuple(Article.from_dict(a) for a in pickle.loads(pickle.dumps(stories)))
+                                                for name, stories in by_source.items()}))
+    new_sessions = measure(lambda: [
+        ([shared[name] for name in SOURCES],
+         storage.load_saved_stories(f"u{user}"),
+         {rows[i]['link']: Article.from_dict(rows[i]) for i in queued[user]})
+        for user in range(args.sessions)])
+
+    old_record = measure(lambda: pickle.loads(pickled[SOURCES[0]])) / len(by_source[SOURCES[0]])
+    new_record = measure(lambda: pickle.loads(pickle.dumps(shared[SOURCES[0]]))) / len(shared[SOURCES[0]])
+
+    print(f"{args.stories} stories, {args.sessions} sessions, {args.saved} saved and {args.queued} queued each")
+    print(f"{'':>8}  {'shared':>10}  {'per session':>12}  {'all sessions':>12}  {'per record':>10}")
+    for name, shared_bytes, session_bytes, record in [("dicts", old_shared, old_sessions, old_record),
+                                                      ("Article", new_shared, new_sessions, new_record)]:
+        print(f"{name:>8}  {shared_bytes / 2**20:>8.1f}MB  {session_bytes / args.sessions / 2**10:>10.1f}KB  "
+              f"{(shared_bytes + session_bytes) / 2**20:>10.1f}MB  {record:>9.0f}B")
+
+if __name__ == "__main__":
+    main()
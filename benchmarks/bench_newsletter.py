@@ -0,0 +1,84 @@
+"""
+Newsletter generation for growing briefing queues against a local fake Gemini
+endpoint whose latency grows with the length of each reply.
+
+    python -m benchmarks.bench_newsletter [--sizes 5 10 25 50 100] [--latency 0.5] [--word-delay 0.01]
+
+For each queue size: the old single prompt (every story in one call, reply
+length grows with the queue), the single composing prompt over the stories'
+summaries, the map-reduce newsletter from a cold note cache, and map-reduce
+again after adding one story to the queue (only that story is mapped). The
+last column is the path generate_newsletter takes for that size: single
+unless the single prompt is over NEWSLETTER_PROMPT_MAX. Prompt sizes are in characters; the fake's latency
+only follows the reply, so a growing single prompt costs nothing here.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("RADAR_CACHE_DIR", tempfile.mkdtemp(prefix="radar-bench-"))
+
+import llm
+import newsletter
+from article import Article
+from benchmarks.fake_gemini import FakeGemini
+from config import FEEDS_BY_REGION, NEWSLETTER_PROMPT_MAX
+
+SOURCES = [name for feeds in FEEDS_BY_REGION.values() for name in feeds]
+
+def make_stories(n, tag):
+    summary = "Officials said the agreement covers trade, transport and power links, with funding from regional banks. " * 4
+    return [Article(link=f"http://bench/{tag}/{i}", title=f"Story {i} on the {tag} corridor deal", source=SOURCES[i % len(SOURCES)],
+                    summary=f"Round {i}. " + summary) for i in range(n)]
+
+def old_newsletter(stories):
+    """The pre-map-reduce prompt: every story in one call."""
+    stories_text = ""
+    for i, s in enumerate(stories):
+        stories_text += f"{i+1}. {s.title} ({s.source}): {s.summary[:150]}...\n"
+    prompt = f"Write a Morning Briefing newsletter based on these stories:\n{stories_text}\nFormat: Intro, Bullet points, Closing thought."
+    return llm.generate("bench", prompt), len(prompt)
+
+def single(stories):
+    groups = newsletter.group_stories(stories)
+    return llm.generate("bench", newsletter.compose_prompt(groups, newsletter.summary_notes(groups)))
+
+def map_reduce(stories):
+    groups = newsletter.group_stories(stories)
+    return llm.generate("bench", newsletter.compose_prompt(groups, newsletter.story_notes("bench", groups)))
+
+def timed(fake, call):
+    calls, prompts = fake.calls, len(fake.prompts)
+    started = time.perf_counter()
+    result = call()
+    elapsed = time.perf_counter() - started
+    return result, elapsed, fake.calls - calls, max((len(p) for p in fake.prompts[prompts:]), default=0)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 10, 25, 50, 100])
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per fake Gemini call")
+    parser.add_argument("--word-delay", type=float, default=0.01, help="extra seconds per word of reply")
+    args = parser.parse_args()
+
+    llm.limiter = llm.RateLimiter(per_minute=6000, burst=100)  # Measure generation, not the shared quota
+    with FakeGemini(latency=args.latency, word_delay=args.word_delay) as fake:
+        llm.GEMINI_BASE_URL = fake.base_url
+        print(f"{'stories':>7}  {'old':>7}  {'single':>7}  {'map-reduce cold':>22}  {'+1 story':>18}  "
+              f"{'largest prompt old/single/map':>27}  used")
+        for n in args.sizes:
+            stories = make_stories(n, f"q{n}")
+            (_, old_prompt), old_time, _, _ = timed(fake, lambda: old_newsletter(stories))
+            _, single_time, _, single_prompt = timed(fake, lambda: single(stories))
+            text, cold_time, cold_calls, new_prompt = timed(fake, lambda: map_reduce(stories))
+            more = stories + make_stories(1, f"q{n}-extra")
+            _, warm_time, warm_calls, _ = timed(fake, lambda: map_reduce(more))
+            print(f"{n:>7}  {old_time:>6.2f}s  {single_time:>6.2f}s  {cold_time:>9.2f}s ({cold_calls:>2} calls)  "
+                  f"{warm_time:>6.2f}s ({warm_calls} calls)  {old_prompt:>9} / {single_prompt:>6} / {new_prompt:<6}  "
+                  f"{'map-reduce' if single_prompt > NEWSLETTER_PROMPT_MAX else 'single'}")
+            if text.startswith("Error"):
+                print(f"  {text}")
+
+if __name__ == "__main__":
+    main()
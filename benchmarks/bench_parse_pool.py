@@ -0,0 +1,79 @@
+"""
+Full-scan latency when every source answers at once, by parse pool size.
+
+    python -m benchmarks.bench_parse_pool [--workers 0 1 2 4] [--rounds 2] [--latency 0.05]
+
+All corpus feeds (benchmarks/corpus.py) are served by a local stub server
+with the same latency and fetched concurrently through
+services.load_feed_articles. Workers 0 parses in the fetch threads (the old
+single-pool behaviour); N > 0 uses N worker processes, started before the
+timed rounds. Titles are rewritten every round so nothing is served from the
+entry index or the sentiment memo. Reports the best round with each stage's
+busy time and peak queue depth, then scans the last round's feeds again:
+every entry is unchanged and the refresh must return as many articles.
+"""
+import argparse
+import concurrent.futures
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("RADAR_CACHE_DIR", tempfile.mkdtemp(prefix="radar-bench-"))
+
+import entry_index
+import pipeline
+import services
+from benchmarks import corpus
+from benchmarks.stub_server import StubFeedServer
+
+def scan(urls):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        futures = [executor.submit(services.load_feed_articles, url, name) for name, url in urls.items()]
+        return sum(len(f.result()) for f in futures)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds every feed takes to answer")
+    args = parser.parse_args()
+
+    feeds = corpus.load()
+    slugs = {name: corpus.slug(name) for name in feeds}
+    print(f"{len(feeds)} sources, latency {args.latency}s, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7}  {'scan':>8}  {'articles':>8}  {'fetch busy/depth':>16}  {'parse busy/depth':>16}  {'ingest busy/depth':>17}  batches")
+    ok = True
+    with StubFeedServer({}, delays={slugs[name]: args.latency for name in feeds}) as server:
+        urls = {name: server.url(slugs[name]) for name in feeds}
+        for workers in args.workers:
+            if pipeline._pool is not None:
+                pipeline._reset_pool(pipeline._pool)
+            pipeline.PARSE_WORKERS = workers
+            pipeline.warm()
+            best = None
+            for round_no in range(args.rounds):
+                # Fresh titles: every entry is new to the entry index and the sentiment memo
+                server.feeds = {slugs[name]: body.replace(b"<title>", f"<title>w{workers}r{round_no} ".encode())
+                                for name, (body, _) in feeds.items()}
+                entry_index._index.clear()
+                pipeline.reset_stats()
+                started = time.perf_counter()
+                count = scan(urls)
+                elapsed = time.perf_counter() - started
+                if best is None or elapsed < best[0]:
+                    best = (elapsed, count, pipeline.stats())
+            elapsed, count, stats = best
+            cells = [f"{stats['stages'][s]['seconds']:7.2f}s / {stats['stages'][s]['max_depth']:<3}" for s in ("fetch", "parse", "ingest")]
+            print(f"{workers:>7}  {elapsed:>7.2f}s  {count:>8}  {cells[0]:>16}  {cells[1]:>16}  {cells[2]:>17}  {stats['pool']['batches']}")
+            # Same bodies again: served from the entry index
+            started = time.perf_counter()
+            again = scan(urls)
+            print(f"{'':>7}  {time.perf_counter() - started:>7.2f}s  {again:>8}  unchanged refresh")
+            if again != count:
+                print(f"FAILED: unchanged refresh returned {again} articles, expected {count}")
+                ok = False
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
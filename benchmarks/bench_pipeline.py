@@ -0,0 +1,188 @@
+"""
+End-to-end ingestion benchmark over the offline feed corpus, with regression checks.
+
+    python -m benchmarks.bench_pipeline [--rounds 3] [--latency 0.05] [--slow 2 --slow-delay 1.0]
+                                        [--failing 1] [--workers 0] [--threshold 0.2] [--no-record]
+
+Every configured source is served from the corpus (benchmarks/corpus.py) by a
+local stub server with the given latency and failures. Each round runs the
+app's ingestion path, services.load_feed_articles, for all feeds at once:
+fetch, parse and enrich (pipeline.parse_entries: normalization, country tags,
+signatures), then ingest (clustering, sentiment, store upsert), timing each
+pipeline stage (pipeline.STAGES): fetch, parse with its per-entry strip,
+image and date steps, and ingest with its sentiment step. A fresh round starts from an empty archive and entry index
+with every title rewritten; the unchanged round that follows serves the same
+bodies again, so entries come from the entry index. The best of each is
+reported. --workers is the parse pool size (0 parses in the fetch threads,
+the default, so the memory round sees all the work). One extra fresh round
+runs under tracemalloc for peak memory. The sentiment backend is the app's
+(RADAR_SENTIMENT_BACKEND). Results are appended to benchmarks/history.jsonl
+and the run exits non-zero if an unchanged refresh loses articles, or if
+throughput drops or peak memory grows by more than --threshold against the
+best of the last runs with the same settings.
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Keep the benchmark's archive, HTTP cache, fetch stats and memo away from the app's
+os.environ.setdefault("RADAR_CACHE_DIR", tempfile.mkdtemp(prefix="radar-bench-"))
+
+import article_store
+import entry_index
+import pipeline
+import sentiment
+import services
+from benchmarks import corpus
+from benchmarks.stub_server import StubFeedServer
+from config import CACHE_DIR, SENTIMENT_BACKEND
+
+STAGES = pipeline.STAGES
+HISTORY_FILE = os.path.join(os.path.dirname(__file__), "history.jsonl")
+BASELINE_RUNS = 5  # Compare against the best of this many previous runs
+
+def empty_store(name):
+    """Point the article store at a new, empty archive (no clusters or labels to reuse)."""
+    with article_store._lock:
+        if article_store._conn is not None:
+            article_store._conn.close()
+            article_store._conn = None
+        article_store.ARTICLE_DB = os.path.join(CACHE_DIR, f"bench-{name}.db")
+    entry_index._index.clear()
+
+def run_round(urls):
+    """One pass over every source. Returns ({stage: busy seconds}, articles, wall seconds)."""
+    pipeline.reset_stats()
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        futures = [executor.submit(services.load_feed_articles, url, name) for name, url in urls.items()]
+        articles = sum(len(f.result()) for f in futures)
+    wall = time.perf_counter() - started
+    stages = pipeline.stats()['stages']
+    return {stage: stages[stage]['seconds'] for stage in STAGES}, articles, wall
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path):
+    try:
+        with open(path, "r") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return []
+
+def check_regressions(result, history, threshold):
+    """Print the comparison with recent runs of the same profile; False on a regression."""
+    previous = [r for r in history if r['profile'] == result['profile']][-BASELINE_RUNS:]
+    if not previous:
+        print("no baseline for these settings yet")
+        return True
+    best_throughput = max(r['throughput'] for r in previous)
+    best_peak = min(r['peak_mb'] for r in previous)
+    print(f"vs best of last {len(previous)}: throughput {result['throughput'] / best_throughput - 1:+.1%}, "
+          f"peak memory {result['peak_mb'] / best_peak - 1:+.1%}")
+    for stage in STAGES:
+        best = min((r['stages'][stage] for r in previous if stage in r['stages']), default=0)
+        if best > 0:
+            print(f"  {stage:<10} {result['stages'][stage] / best - 1:+7.1%}")
+    ok = True
+    if result['throughput'] < best_throughput * (1 - threshold):
+        print(f"REGRESSION: throughput below {1 - threshold:.0%} of baseline")
+        ok = False
+    if result['peak_mb'] > best_peak * (1 + threshold):
+        print(f"REGRESSION: peak memory above {1 + threshold:.0%} of baseline")
+        ok = False
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds every feed takes to answer")
+    parser.add_argument("--slow", type=int, default=0, help="feeds that answer after --slow-delay instead")
+    parser.add_argument("--slow-delay", type=float, default=1.0)
+    parser.add_argument("--failing", type=int, default=0, help="feeds that return HTTP 500")
+    parser.add_argument("--workers", type=int, default=0, help="parse pool processes (0: parse in the fetch threads)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--history", default=HISTORY_FILE)
+    parser.add_argument("--no-record", action="store_true", help="do not append this run to the history")
+    args = parser.parse_args()
+
+    feeds = corpus.load()
+    slugs = {name: corpus.slug(name) for name in feeds}
+    names = list(feeds)
+    delays = {slugs[name]: args.latency for name in names}
+    delays.update({slugs[name]: args.slow_delay for name in names[:args.slow]})
+    failures = {slugs[name]: 500 for name in names[args.slow:args.slow + args.failing]}
+    recorded = sum(1 for _, is_recorded in feeds.values() if is_recorded)
+    print(f"{len(feeds)} sources ({recorded} recorded, {len(feeds) - recorded} synthetic), "
+          f"latency {args.latency}s, {args.slow} slow, {args.failing} failing, "
+          f"{args.workers} parse workers, {SENTIMENT_BACKEND} sentiment")
+
+    # Lazy imports, lexicon loading and worker start-up are not part of the pipeline
+    sentiment.warm()
+    pipeline.PARSE_WORKERS = args.workers
+    pipeline.warm()
+    ok = True
+    fresh, unchanged = [], []
+    with StubFeedServer({}, delays=delays, failures=failures) as server:
+        urls = {name: server.url(slugs[name]) for name in names}
+
+        def serve(tag):
+            # New titles: nothing is served from the entry index or the sentiment memo
+            server.feeds = {slugs[name]: body.replace(b"<title>", f"<title>{tag} ".encode()) for name, (body, _) in feeds.items()}
+            empty_store(tag)
+
+        for round_no in range(args.rounds):
+            serve(f"r{round_no}")
+            fresh.append(run_round(urls))
+            unchanged.append(run_round(urls))
+            if unchanged[-1][1] != fresh[-1][1]:
+                print(f"FAILED: unchanged refresh returned {unchanged[-1][1]} articles, expected {fresh[-1][1]}")
+                ok = False
+        serve("memory")
+        tracemalloc.start()
+        run_round(urls)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    stages = {stage: min(r[0][stage] for r in fresh) for stage in STAGES}
+    entries = fresh[0][1]
+    wall = min(r[2] for r in fresh)
+    result = {
+        'time': time.time(),
+        'revision': git_revision(),
+        'profile': {'sources': len(feeds), 'recorded': recorded, 'entries': entries, 'latency': args.latency,
+                    'slow': args.slow, 'slow_delay': args.slow_delay, 'failing': args.failing,
+                    'backend': SENTIMENT_BACKEND, 'workers': args.workers},
+        'stages': stages,
+        'wall': wall,
+        'throughput': entries / wall,
+        'unchanged': {'stages': {stage: min(r[0][stage] for r in unchanged) for stage in STAGES},
+                      'wall': min(r[2] for r in unchanged)},
+        'peak_mb': peak / 1e6,
+    }
+
+    print(f"{'stage':<10} {'fresh':>12} {'unchanged':>12}   (busy time summed over feeds; steps indented under their stage)")
+    for stage in STAGES:
+        label = stage if stage in ("fetch", "parse", "ingest") else f"  {stage}"
+        print(f"{label:<10} {stages[stage] * 1000:9.1f} ms {result['unchanged']['stages'][stage] * 1000:9.1f} ms")
+    print(f"{'wall':<10} {wall * 1000:9.1f} ms {result['unchanged']['wall'] * 1000:9.1f} ms")
+    print(f"{entries} articles, {result['throughput']:.0f} articles/s fresh, peak {result['peak_mb']:.1f} MB")
+
+    ok = check_regressions(result, load_history(args.history), args.threshold) and ok
+    if not args.no_record:
+        with open(args.history, "a") as f:
+            f.write(json.dumps(result) + "\n")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
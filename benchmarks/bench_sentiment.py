@@ -0,0 +1,76 @@
+"""
+Articles/second and label agreement for the sentiment backends.
+
+    python -m benchmarks.bench_sentiment [--db .cache/articles.db] [--corpus stories.json ...] [--repeat 5]
+
+The corpus is the app's article archive (--db, filled by the poller or a
+scan), i.e. real headlines from the configured sources, plus any JSON story
+files given with --corpus.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+os.environ.setdefault("RADAR_CACHE_DIR", tempfile.mkdtemp(prefix="radar-bench-"))
+APP_CACHE_DIR = ".cache"
+
+import sentiment
+
+def load_archive(path):
+    """Title + summary of every archived article (read-only; empty if there is no archive)."""
+    if not os.path.exists(path):
+        return []
+    try:
+        with sqlite3.connect(f"file:{path}?mode=ro", uri=True) as conn:
+            return [f"{title} {summary}" for title, summary in conn.execute("SELECT title, summary FROM articles")]
+    except sqlite3.Error as e:
+        print(f"Could not read {path}: {e}")
+        return []
+
+def load_texts(paths):
+    texts = []
+    for path in paths:
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(data, dict):
+            data = data.get('articles', list(data.values()))
+        texts.extend(a['title'] + " " + a['summary'] for a in data if isinstance(a, dict) and 'title' in a)
+    return texts
+
+def timed(label, fn, texts):
+    started = time.perf_counter()
+    results = fn(texts)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {len(texts) / elapsed:10.0f} articles/s")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join(APP_CACHE_DIR, "articles.db"), help="article archive to read")
+    parser.add_argument("--corpus", nargs="*", default=[], help="extra JSON story files")
+    parser.add_argument("--repeat", type=int, default=1, help="make each text distinct this many times to grow the corpus")
+    args = parser.parse_args()
+
+    base = load_archive(args.db) + load_texts(args.corpus)
+    if not base:
+        parser.error("no stories found; run `python poller.py --once` first or pass --db or --corpus")
+    texts = [f"{t} #{n}" if n else t for n in range(args.repeat) for t in base]
+    print(f"{len(texts)} texts")
+
+    reference = timed("textblob (per text)", lambda ts: [sentiment.classify(sentiment._textblob_polarity(t)) for t in ts], texts)
+    sentiment.load_lexicon()
+    lexicon = timed("lexicon (per text)", lambda ts: [sentiment.classify(sentiment._lexicon_polarity(t)) for t in ts], texts)
+    timed("lexicon batch, cold memo", lambda ts: sentiment.score_batch(ts, backend="lexicon"), texts)
+    timed("lexicon batch, warm memo", lambda ts: sentiment.score_batch(ts, backend="lexicon"), texts)
+
+    agree = sum(a[0] == b[0] for a, b in zip(reference, lexicon))
+    print(f"label agreement vs textblob: {agree / len(texts):.1%}")
+
+if __name__ == "__main__":
+    main()
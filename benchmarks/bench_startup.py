@@ -0,0 +1,93 @@
+"""
+Cold-start import cost, measured in fresh interpreters.
+
+    python -m benchmarks.bench_startup [--runs 5] [--threshold 0.2] [--no-record]
+
+Each scenario runs --runs times in a new process and reports the median wall
+time of its imports:
+  streamlit  - the framework alone (floor for any script load)
+  app        - every module app.py imports (what a new process pays before the first render)
+  eager      - app plus the heavy dependencies loaded up front, as before the lazy imports
+  warm-up    - warmup.preload() after the app imports (paid in the background)
+The heavy modules left loaded after the app imports are listed; there should
+be none. Results are appended to benchmarks/startup_history.jsonl and the run
+exits non-zero if the app import time grows by more than --threshold against
+the best of the last runs.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_pipeline import BASELINE_RUNS, git_revision, load_history
+
+HISTORY_FILE = os.path.join(os.path.dirname(__file__), "startup_history.jsonl")
+HEAVY = ["google.genai", "cloudscraper", "feedparser", "PIL.Image", "textblob", "requests", "httpx"]
+APP_IMPORTS = "import services, storage, article_store, image_cache, view, warmup"
+SCENARIOS = {
+    'streamlit': ("import streamlit", ""),
+    'app': ("import streamlit; " + APP_IMPORTS, ""),
+    'eager': ("import streamlit; " + APP_IMPORTS + "; import " + ", ".join(HEAVY), ""),
+    'warm-up': ("import warmup; warmup.preload()", "import streamlit; " + APP_IMPORTS),
+}
+
+PROBE = """
+import sys, time, json
+{setup}
+started = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - started
+print(json.dumps({{'seconds': elapsed, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def run(code, setup, env):
+    out = subprocess.run([sys.executable, "-c", PROBE.format(code=code, setup=setup, heavy=HEAVY)],
+                         capture_output=True, text=True, env=env, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--history", default=HISTORY_FILE)
+    parser.add_argument("--no-record", action="store_true", help="do not append this run to the history")
+    args = parser.parse_args()
+
+    # Warm caches (lexicon, .pyc) live in a scratch dir shared by every run, as on a long-lived host
+    env = {**os.environ, 'RADAR_CACHE_DIR': os.environ.get("RADAR_CACHE_DIR") or tempfile.mkdtemp(prefix="radar-bench-"),
+           'PYTHONPATH': os.getcwd()}
+    run(SCENARIOS['warm-up'][0], "", env)
+
+    results, heavy = {}, []
+    for name, (code, setup) in SCENARIOS.items():
+        samples = [run(code, setup, env) for _ in range(args.runs)]
+        results[name] = statistics.median(s['seconds'] for s in samples)
+        if name == 'app':
+            heavy = samples[0]['heavy']
+        print(f"{name:<10} {results[name] * 1000:8.1f} ms")
+    print(f"app over streamlit: {(results['app'] - results['streamlit']) * 1000:.1f} ms, "
+          f"saved vs eager: {(results['eager'] - results['app']) * 1000:.1f} ms")
+    print(f"heavy modules loaded by the app imports: {', '.join(heavy) or 'none'}")
+
+    result = {'time': time.time(), 'revision': git_revision(), 'python': sys.version.split()[0], 'seconds': results}
+    previous = [r for r in load_history(args.history) if r['python'] == result['python']][-BASELINE_RUNS:]
+    ok = True
+    if previous:
+        best = min(r['seconds']['app'] for r in previous)
+        print(f"vs best of last {len(previous)}: app imports {results['app'] / best - 1:+.1%}")
+        if results['app'] > best * (1 + args.threshold):
+            print(f"REGRESSION: app imports above {1 + args.threshold:.0%} of baseline")
+            ok = False
+    else:
+        print("no baseline yet")
+    if not args.no_record:
+        with open(args.history, "a") as f:
+            f.write(json.dumps(result) + "\n")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Save-button latency and concurrent-writer safety: the old whole-file JSON
+rewrite against the SQLite store.
+
+    python -m benchmarks.bench_storage [--sizes 100 1000 10000] [--writers 4] [--saves 50]
+
+For each collection size, the median time of one save toggle. Then --writers
+processes each save --saves stories at the same time, every one loading and
+toggling like a separate app session; stories missing at the end were lost.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("RADAR_USER_DB", os.path.join(tempfile.mkdtemp(prefix="radar-bench-"), "user_data.db"))
+
+import storage
+from article import Article
+
+storage.LEGACY_FAVORITES_FILE = storage.LEGACY_SAVED_STORIES_FILE = os.environ["RADAR_USER_DB"] + ".none"  # Start empty
+
+def make_story(i, tag="s"):
+    return {'link': f"http://bench/{tag}/{i}", 'title': f"Story {i} about the regional power pool", 'source': "Bench",
+            'summary': "Officials said the agreement covers trade, transport and power links. " * 3,
+            'image': None, 'timestamp': 1700000000 + i}
+
+def json_toggle(path, story):
+    """The old path: load the whole file, flip one story, rewrite the whole file."""
+    try:
+        with open(path, "r") as f:
+            stories = json.load(f)
+    except Exception:
+        stories = {}
+    if story['link'] in stories:
+        del stories[story['link']]
+    else:
+        stories[story['link']] = story
+    with open(path, "w") as f:
+        json.dump(stories, f)
+
+def sqlite_toggle(user, story):
+    # What the app does: membership comes from session state, the write is one row
+    storage.save_story(Article.from_dict(story), user)
+
+def median_ms(fn, repeat=21):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+def writer(args):
+    backend, path, worker, saves = args
+    for i in range(saves):
+        story = make_story(i, f"w{worker}")
+        if backend == "json":
+            json_toggle(path, story)
+        else:
+            storage.save_story(Article.from_dict(story), "concurrent")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--saves", type=int, default=50)
+    args = parser.parse_args()
+    workdir = os.path.dirname(os.environ["RADAR_USER_DB"])
+
+    print(f"{'saved':>7}  {'json rewrite':>12}  {'sqlite row':>10}")
+    for n in args.sizes:
+        path = os.path.join(workdir, f"saved_{n}.json")
+        with open(path, "w") as f:
+            json.dump({s['link']: s for s in (make_story(i) for i in range(n))}, f)
+        user = f"size{n}"
+        storage.save_saved_stories({s['link']: Article.from_dict(s) for s in (make_story(i) for i in range(n))}, user)
+        extra = make_story(n, "extra")
+        old = median_ms(lambda: json_toggle(path, extra))
+        new = median_ms(lambda: sqlite_toggle(user, extra))
+        print(f"{n:>7}  {old:>10.2f}ms  {new:>8.2f}ms")
+
+    expected = args.writers * args.saves
+    path = os.path.join(workdir, "concurrent.json")
+    with multiprocessing.get_context("spawn").Pool(args.writers) as pool:
+        for backend in ("json", "sqlite"):
+            pool.map(writer, [(backend, path, w, args.saves) for w in range(args.writers)])
+    try:
+        with open(path) as f:
+            kept_json = len(json.load(f))
+    except ValueError:
+        kept_json = "corrupt file"
+    kept_sqlite = len(storage.load_saved_stories("concurrent"))
+    print(f"{args.writers} concurrent writers x {args.saves} saves: json kept {kept_json}/{expected}, sqlite kept {kept_sqlite}/{expected}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Recorded feed XML for every source in config.FEEDS_BY_REGION.
+
+    python -m benchmarks.corpus --record     # fetch each configured source once into benchmarks/corpus/
+
+Sources without a recording get a synthetic feed in the same publisher style
+(media tags, enclosures, inline images, entities, scripts and truncated
+markup) so benchmarks always cover every configured source offline.
+
+No recordings are committed: until --record has been run on a machine with
+network access, the whole corpus is synthetic (the benchmarks print
+"0 recorded"). Recorded feeds are publishers' content, so keep them local.
+"""
+import argparse
+import os
+import random
+import re
+import time
+from email.utils import formatdate
+from xml.sax.saxutils import escape
+from config import ALL_SOURCES_FLAT
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+
+def slug(source_name):
+    return re.sub(r"[^a-z0-9]+", "-", source_name.lower()).strip("-")
+
+def _path(source_name):
+    return os.path.join(CORPUS_DIR, slug(source_name) + ".xml")
+
+def synthetic_feed(source_name, items=20, start_ts=None):
+    """Deterministic RSS 2.0 document in the style of the publishers' feeds."""
+    rng = random.Random(source_name)
+    start_ts = start_ts or time.time()
+    words = ("election minister rebels port gold cotton drought floods court budget talks "
+             "Kenya Nigeria Ghana Sudan Ethiopia Mali Senegal & \"quoted\" 'single'").split()
+    entries = []
+    for i in range(items):
+        link = f"https://{slug(source_name)}.example/news/{i}"
+        paragraphs = "".join(f"<p>{escape(' '.join(rng.choices(words, k=rng.randint(12, 40))))}</p>" for _ in range(rng.randint(1, 4)))
+        style = i % 6
+        media = ""
+        if style == 0:
+            media = f'<media:content url="{link}/hero.jpg" medium="image" width="1200"/>'
+        elif style == 1:
+            media = f'<media:thumbnail url="{link}/thumb.jpg"/>'
+        elif style == 2:
+            media = f'<enclosure url="{link}/photo.jpg" type="image/jpeg" length="204800"/>'
+        if style in (3, 4):
+            paragraphs = f'<figure><img class="wp-post-image" src="{link}/inline.jpg" alt="photo"/><figcaption>Photo</figcaption></figure>' + paragraphs
+        if style == 4:
+            paragraphs += '<script>track("x")</script><div class="share"><a href="#">Share</a></div>'
+        if style == 5:
+            # Guardian-style: "Continue reading" link, sometimes cut mid-tag by the publisher
+            paragraphs += f'<a href="{link}">Continue reading...</a>' if i % 2 else '<a href="' + link
+        entries.append(
+            f"<item><title>{escape(' '.join(rng.choices(words, k=8)))}</title>"
+            f"<link>{link}</link><guid>{link}</guid>"
+            f"<description>{escape(paragraphs)}</description>{media}"
+            f"<pubDate>{formatdate(start_ts - i * 1800, usegmt=True)}</pubDate></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>'
+        f"<title>{escape(source_name)}</title>{''.join(entries)}</channel></rss>"
+    ).encode("utf-8")
+
+def load(sources=None):
+    """{source name: (xml bytes, recorded?)} for the given (default: all configured) sources."""
+    corpus = {}
+    for name in sources or ALL_SOURCES_FLAT:
+        try:
+            with open(_path(name), "rb") as f:
+                corpus[name] = (f.read(), True)
+        except OSError:
+            corpus[name] = (synthetic_feed(name), False)
+    return corpus
+
+def record(sources=None):
+    import fetch_strategy
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    for name in sources or ALL_SOURCES_FLAT:
+        body, method = fetch_strategy.fetch(ALL_SOURCES_FLAT[name])
+        if not body:
+            print(f"{name:<32} failed")
+            continue
+        with open(_path(name), "wb") as f:
+            f.write(body if isinstance(body, bytes) else body.encode("utf-8"))
+        print(f"{name:<32} {len(body):>8} bytes via {method}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", action="store_true", help="fetch and save every configured source")
+    parser.add_argument("sources", nargs="*", help="limit to these source names")
+    args = parser.parse_args()
+    if args.record:
+        record(args.sources)
+    else:
+        for name, (body, recorded) in load(args.sources).items():
+            print(f"{name:<32} {len(body):>8} bytes {'recorded' if recorded else 'synthetic'}")
+
+if __name__ == "__main__":
+    main()
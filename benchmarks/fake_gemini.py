@@ -0,0 +1,116 @@
+import hashlib
+import http.server
+import json
+import re
+import threading
+import time
+
+# Local stand-in for the Gemini REST API (generateContent and
+# streamGenerateContent). Point the app at it with
+# RADAR_GEMINI_BASE_URL=<server.base_url>. Latency, throttling (429) and
+# concurrency are configurable and observable.
+
+_ITEM_RE = re.compile(r"^\[(\d+)\] (.*)$", re.MULTILINE)
+_BULLET_RE = re.compile(r"^(?:- |\d+\. )(.*)$", re.MULTILINE)
+_LIMIT_RE = re.compile(r"under (\d+) words")
+
+def fake_reply(prompt):
+    """
+    Deterministic reply: a JSON array of notes for newsletter map prompts
+    ("[i] ..." lines), one sentence per bullet for prompts that list stories
+    (cut to "under N words" when asked), otherwise a short draft.
+    """
+    digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+    if "JSON array" in prompt:
+        return json.dumps([{"id": int(i), "note": " ".join(line.split()[:15])} for i, line in _ITEM_RE.findall(prompt)])
+    bullets = _BULLET_RE.findall(prompt)
+    if bullets:
+        words = f"Briefing {digest}.".split() + [w for line in bullets for w in line.split()[:20] + ["."]]
+        limit = _LIMIT_RE.search(prompt)
+        return " ".join(words[:int(limit.group(1)) if limit else None])
+    return f"Draft {digest}: " + " ".join(prompt.split()[:12])
+
+class FakeGemini:
+    """
+    Threaded HTTP server. Each call sleeps `latency` seconds plus
+    `word_delay` per word of reply (output-bound generation); the first
+    `throttle_first` calls answer 429 RESOURCE_EXHAUSTED. Streaming replies
+    are sent word by word every `token_delay` seconds. `calls`, `prompts` and
+    `max_concurrent` record what the client did.
+    """
+
+    def __init__(self, latency=0.5, throttle_first=0, token_delay=0.02, word_delay=0.0):
+        self.latency = latency
+        self.throttle_first = throttle_first
+        self.token_delay = token_delay
+        self.word_delay = word_delay
+        self.calls = 0
+        self.prompts = []
+        self.max_concurrent = 0
+        self._active = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _json(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                prompt = "".join(p.get("text", "") for c in request.get("contents", []) for p in c.get("parts", []))
+                with server._lock:
+                    server.calls += 1
+                    throttled = server.calls <= server.throttle_first
+                    server._active += 1
+                    server.max_concurrent = max(server.max_concurrent, server._active)
+                try:
+                    if throttled:
+                        time.sleep(server.latency)
+                        self._json(429, {"error": {"code": 429, "message": "Resource exhausted", "status": "RESOURCE_EXHAUSTED"}})
+                        return
+                    server.prompts.append(prompt)
+                    reply = fake_reply(prompt)
+                    time.sleep(server.latency + server.word_delay * len(reply.split()))
+                    if ":streamGenerateContent" not in self.path:
+                        self._json(200, {"candidates": [{"content": {"parts": [{"text": reply}], "role": "model"}, "finishReason": "STOP"}]})
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.send_header("Connection", "close")
+                    self.end_headers()
+                    words = reply.split(" ")
+                    for i, word in enumerate(words):
+                        chunk = {"candidates": [{"content": {"parts": [{"text": word + (" " if i < len(words) - 1 else "")}], "role": "model"}}]}
+                        self.wfile.write(b"data: " + json.dumps(chunk).encode("utf-8") + b"\r\n\r\n")
+                        self.wfile.flush()
+                        time.sleep(server.token_delay)
+                    self.close_connection = True
+                finally:
+                    with server._lock:
+                        server._active -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,87 @@
+import http.server
+import threading
+import time
+from email.utils import formatdate
+
+# Local stand-in for publisher feeds. Serves RSS at /feed/<slug> with
+# per-feed injected latency and failures so fetch backends can be compared
+# without touching live sites.
+
+def make_rss(slug, items=10, start_ts=None):
+    """Build a small RSS 2.0 document with `items` entries."""
+    start_ts = start_ts or time.time()
+    entries = []
+    for i in range(items):
+        pub = formatdate(start_ts - i * 900, usegmt=True)
+        entries.append(
+            f"<item><title>{slug} story {i}</title>"
+            f"<link>http://stub.local/{slug}/{i}</link>"
+            f"<guid>{slug}-{i}</guid>"
+            f"<description>&lt;p&gt;Summary for {slug} story {i} about Kenya and Nigeria.&lt;/p&gt;"
+            f"&lt;img src=\"http://stub.local/{slug}/{i}.jpg\"&gt;</description>"
+            f"<pubDate>{pub}</pubDate></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>{slug}</title>{''.join(entries)}</channel></rss>"
+    ).encode("utf-8")
+
+class StubFeedServer:
+    """
+    Threaded HTTP server. `feeds` maps slug -> bytes body; `delays` maps
+    slug -> seconds to sleep before answering; `failures` maps slug -> HTTP
+    status to return instead of the body (0 closes the connection).
+    """
+
+    def __init__(self, feeds, delays=None, failures=None):
+        self.feeds = feeds
+        self.delays = delays or {}
+        self.failures = failures or {}
+        self.hits = {}
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                slug = self.path.rstrip("/").rsplit("/", 1)[-1]
+                server.hits[slug] = server.hits.get(slug, 0) + 1
+                time.sleep(server.delays.get(slug, 0))
+                if slug in server.failures:
+                    status = server.failures[slug]
+                    if status == 0:
+                        self.close_connection = True
+                        return
+                    self.send_response(status)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = server.feeds.get(slug)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, slug):
+        return f"http://127.0.0.1:{self.httpd.server_port}/feed/{slug}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,77 @@
+import hashlib
+import re
+from array import array
+
+# Near-duplicate detection for syndicated stories. Each article gets a MinHash
+# signature over word shingles of its normalised title + summary; LSH banding
+# turns signatures into bucket keys so candidates are found by exact lookups
+# (linear in the number of articles) and confirmed by estimated Jaccard.
+
+NUM_HASHES = 32
+BANDS = 8                    # 8 bands x 4 rows: pairs above ~0.6 Jaccard almost always collide
+ROWS = NUM_HASHES // BANDS
+SHINGLE_SIZE = 2
+MIN_SHINGLES = 4             # Too little text to judge similarity
+SIMILARITY_THRESHOLD = 0.5
+
+_MERSENNE = (1 << 61) - 1
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE | 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE)
+    for i in range(NUM_HASHES)
+]
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("a an and are as at be by for from has have in is it its of on or that the to was were will with".split())
+
+def shingles(text):
+    words = [w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS]
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+def signature(text):
+    """MinHash signature (array of NUM_HASHES ints), or None if the text is too short."""
+    grams = shingles(text)
+    if len(grams) < MIN_SHINGLES:
+        return None
+    hashed = [int.from_bytes(hashlib.blake2b(g.encode(), digest_size=8).digest(), "big") for g in grams]
+    return array("Q", [min((a * h + b) % _MERSENNE for h in hashed) for a, b in _PERMUTATIONS])
+
+def article_signature(article):
+    return signature(article['title'] + " " + article['summary'])
+
+def band_keys(sig):
+    """LSH bucket keys, one per band."""
+    return [f"{band}:{hashlib.blake2b(sig[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).hexdigest()}"
+            for band in range(BANDS)]
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the underlying shingle sets."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_HASHES
+
+def cluster_id_for(link):
+    return hashlib.sha1(link.encode("utf-8")).hexdigest()[:16]
+
+class ClusterIndex:
+    """In-memory LSH index: add() articles, match() finds the best earlier near-duplicate."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.members = []
+
+    def match(self, sig):
+        best, best_sim = None, SIMILARITY_THRESHOLD
+        seen = set()
+        for key in band_keys(sig):
+            for idx in self.buckets.get(key, ()):
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                sim = similarity(sig, self.members[idx][0])
+                if sim >= best_sim:
+                    best, best_sim = self.members[idx][1], sim
+        return best
+
+    def add(self, sig, item):
+        idx = len(self.members)
+        self.members.append((sig, item))
+        for key in band_keys(sig):
+            self.buckets.setdefault(key, []).append(idx)
@@ -1,5 +1,81 @@
+import os
+
 # --- CONSTANTS ---
 ITEMS_PER_PAGE = 10
+VIEW_CACHE_SIZE = 32    # Filter combinations whose story list stays cached (view.py)
+
+# --- LOCAL CACHE ---
+CACHE_DIR = os.environ.get("RADAR_CACHE_DIR", ".cache")
+HTTP_CACHE_DIR = os.path.join(CACHE_DIR, "http")
+
+# --- STARTUP ---
+WARMUP = os.environ.get("RADAR_WARMUP", "1") != "0"   # Preload lazily imported dependencies in the background (warmup.py)
+
+# --- USER DATA ---
+USER_DB = os.environ.get("RADAR_USER_DB", "user_data.db")    # Saved stories and favorites (not a cache: kept out of CACHE_DIR)
+DEFAULT_USER = os.environ.get("RADAR_USER", "default")        # Namespace when the app URL has no ?user=
+LEGACY_FAVORITES_FILE = "favorites.json"                      # Imported once into DEFAULT_USER's namespace
+LEGACY_SAVED_STORIES_FILE = "saved_stories.json"
+
+# --- HTTP CONNECTION POOLING ---
+HTTP_POOL_HOSTS = 32     # Host pools kept alive per session (>= distinct feed hosts)
+HTTP_POOL_MAXSIZE = 8    # Keep-alive connections per host
+BROWSER_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
+
+# --- FETCH ENGINE ---
+FETCH_BACKEND = os.environ.get("RADAR_FETCH_BACKEND", "threads")  # "threads" or "async"
+SCAN_DEADLINE = 20.0     # Seconds before an async scan returns whatever has arrived
+FEED_BUDGET = 12.0       # Per-feed latency budget (seconds) in the async engine
+PER_HOST_LIMIT = 2       # Concurrent fetches allowed against one host
+PARSE_WORKERS = int(os.environ.get("RADAR_PARSE_WORKERS", os.cpu_count() or 1))  # Parse/enrich processes in the poller (0: parse in the fetch thread)
+INLINE_PARSE_WORKERS = int(os.environ.get("RADAR_INLINE_PARSE_WORKERS", min(2, os.cpu_count() or 1)))  # ...in a Streamlit process scanning inline
+PARSE_BATCH = 8          # Most feed bodies handed to one parse worker at a time
+HEDGE_DELAY = 2.0        # Seconds to wait on a fetch method before racing the next one
+
+# --- IMAGE CACHE ---
+THUMB_DIR = os.path.join(CACHE_DIR, "thumbs")
+THUMB_WIDTH = 480            # Card images are downscaled to this width (JPEG)
+THUMB_CACHE_BYTES = 64 * 1024 * 1024  # Disk budget; least recently viewed thumbnails are evicted
+IMAGE_WORKERS = 4            # Concurrent image downloads
+IMAGE_MAX_BYTES = 8 * 1024 * 1024     # Skip originals larger than this
+IMAGE_WAIT = 0.0             # Seconds a page waits for missing thumbnails (0: show the original URL now, thumbnails from the next render)
+IMAGE_RETRY_AFTER = 3600     # Failed images are not retried for this many seconds
+
+# --- ARTICLE STORE ---
+ARTICLE_DB = os.path.join(CACHE_DIR, "articles.db")
+CLUSTER_WINDOW = 3 * 86400  # Only cluster stories published within this many seconds of each other
+
+# --- GEMINI ---
+GEMINI_MODEL = "gemini-2.5-flash"
+GEMINI_BASE_URL = os.environ.get("RADAR_GEMINI_BASE_URL")  # e.g. a local fake (benchmarks/fake_gemini.py)
+LLM_CACHE_DB = os.path.join(CACHE_DIR, "llm.db")
+LLM_CONCURRENCY = 4           # Parallel Gemini calls for bulk drafting
+LLM_REQUESTS_PER_MINUTE = 60  # Shared rate limit across all calls
+LLM_BURST = 10                # Requests allowed back to back before the rate limit applies
+LLM_MAX_RETRIES = 4           # On 429/5xx/network errors, with exponential backoff
+LLM_BACKOFF = 1.0             # Seconds before the first retry (doubles each time)
+NEWSLETTER_BATCH = 8          # Minimum stories per note-taking (map) call; grows so one parallel wave covers the queue
+NEWSLETTER_WORDS = 500        # Length cap for the composed briefing
+NEWSLETTER_PROMPT_MAX = 32000 # Characters; a single composing prompt longer than this is mapped to notes first
+
+# --- TELEMETRY ---
+TELEMETRY_DB = os.path.join(CACHE_DIR, "telemetry.db")
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0)  # Fetch latency histogram upper bounds (seconds)
+
+# --- BACKGROUND POLLER ---
+FEED_STORE_DIR = os.path.join(CACHE_DIR, "feeds")  # Poller lock and schedule
+POLLER_HEARTBEAT = os.path.join(FEED_STORE_DIR, "heartbeat.json")  # Kept out of the article DB so it does not invalidate views
+POLL_INTERVAL = 300      # Starting interval per source before its cadence is learned
+POLL_TICK = 30           # Poller wakes (and writes its heartbeat) this often
+POLLER_STALE_AFTER = 120 # UI falls back to inline fetching if the heartbeat is older than this
+MIN_POLL_INTERVAL = 60   # Adaptive scheduler bounds (seconds)
+MAX_POLL_INTERVAL = 3600
+
+# --- SENTIMENT ---
+SENTIMENT_BACKEND = os.environ.get("RADAR_SENTIMENT_BACKEND", "textblob")  # "textblob" or "lexicon"
+SENTIMENT_MEMO_SIZE = 20000  # In-process LRU entries
+SENTIMENT_DB = os.path.join(CACHE_DIR, "sentiment.db")
+SENTIMENT_DB_ROWS = 200000     # On-disk memo rows; the least recently used are pruned first
 
 # --- EXTENSIVE DATA SOURCES ---
 FEEDS_BY_REGION = {
@@ -63,3 +139,61 @@ AFRICAN_COUNTRIES = sorted([
     "South Africa", "South Sudan", "Sudan", "Tanzania", "Togo", "Tunisia", 
     "Uganda", "Zambia", "Zimbabwe"
 ])
+
+# Aliases and demonyms recognised by the country tagger, in addition to the names above
+COUNTRY_ALIASES = {
+    "Algeria": ["Algerian"],
+    "Angola": ["Angolan"],
+    "Benin": ["Beninese"],
+    "Botswana": ["Motswana", "Batswana"],
+    "Burkina Faso": ["Burkinabe", "Burkinabè", "Ouagadougou"],
+    "Burundi": ["Burundian"],
+    "Cabo Verde": ["Cape Verde", "Cape Verdean"],
+    "Cameroon": ["Cameroonian"],
+    "Central African Republic": ["CAR", "Centrafrique", "Bangui"],
+    "Chad": ["Chadian", "N'Djamena"],
+    "Comoros": ["Comorian"],
+    "Democratic Republic of the Congo": ["DRC", "DR Congo", "D.R. Congo", "Congo-Kinshasa", "Kinshasa", "Congolese"],
+    "Republic of the Congo": ["Congo-Brazzaville", "Brazzaville", "Congolese"],
+    "Cote d'Ivoire": ["Côte d'Ivoire", "Ivory Coast", "Ivorian", "Abidjan"],
+    "Djibouti": ["Djiboutian"],
+    "Egypt": ["Egyptian", "Cairo"],
+    "Equatorial Guinea": ["Equatoguinean"],
+    "Eritrea": ["Eritrean", "Asmara"],
+    "Eswatini": ["Swaziland", "Swazi"],
+    "Ethiopia": ["Ethiopian", "Addis Ababa"],
+    "Gabon": ["Gabonese"],
+    "Gambia": ["Gambian"],
+    "Ghana": ["Ghanaian", "Accra"],
+    "Guinea": ["Guinean", "Conakry"],
+    "Guinea-Bissau": ["Bissau-Guinean"],
+    "Kenya": ["Kenyan", "Nairobi"],
+    "Lesotho": ["Basotho", "Mosotho"],
+    "Liberia": ["Liberian", "Monrovia"],
+    "Libya": ["Libyan", "Tripoli"],
+    "Madagascar": ["Malagasy"],
+    "Malawi": ["Malawian", "Lilongwe"],
+    "Mali": ["Malian", "Bamako"],
+    "Mauritania": ["Mauritanian"],
+    "Mauritius": ["Mauritian"],
+    "Morocco": ["Moroccan", "Rabat"],
+    "Mozambique": ["Mozambican", "Maputo"],
+    "Namibia": ["Namibian", "Windhoek"],
+    "Niger": ["Nigerien", "Niamey"],
+    "Nigeria": ["Nigerian", "Abuja", "Lagos"],
+    "Rwanda": ["Rwandan", "Kigali"],
+    "Sao Tome and Principe": ["São Tomé and Príncipe", "Sao Tome"],
+    "Senegal": ["Senegalese", "Dakar"],
+    "Seychelles": ["Seychellois"],
+    "Sierra Leone": ["Sierra Leonean", "Freetown"],
+    "Somalia": ["Somali", "Mogadishu"],
+    "South Africa": ["South African", "Pretoria", "Johannesburg", "Cape Town"],
+    "South Sudan": ["South Sudanese", "Juba"],
+    "Sudan": ["Sudanese", "Khartoum"],
+    "Tanzania": ["Tanzanian", "Dodoma", "Dar es Salaam"],
+    "Togo": ["Togolese", "Lomé"],
+    "Tunisia": ["Tunisian", "Tunis"],
+    "Uganda": ["Ugandan", "Kampala"],
+    "Zambia": ["Zambian", "Lusaka"],
+    "Zimbabwe": ["Zimbabwean", "Harare"],
+}
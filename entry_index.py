@@ -0,0 +1,64 @@
+import hashlib
+import threading
+import time
+
+# Per-source index of entries already processed, keyed by GUID/link with a
+# content hash. Lets a refresh skip HTML stripping, sentiment, image and date
+# work for entries it has seen before and only process new or edited ones.
+
+_lock = threading.Lock()
+_index = {}          # source name -> {entry key: (content hash, article)}
+_refresh_stats = {}  # source name -> counts from the latest refresh
+
+def entry_key(entry):
+    return entry.get('id') or entry.get('link') or entry.get('title', '')
+
+def content_hash(entry):
+    raw = "\x1f".join([
+        entry.get('title', ''),
+        entry.get('link', ''),
+        entry.get('summary', ''),
+        entry.get('published', ''),
+    ])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class RefreshDiff:
+    """Tracks one refresh of a source against its previous index."""
+
+    def __init__(self, source_name):
+        self.source_name = source_name
+        with _lock:
+            self.previous = _index.get(source_name, {})
+        self.current = {}
+        self.counts = {'new': 0, 'changed': 0, 'reused': 0}
+
+    def known(self):
+        """{key: content hash} of the previous refresh, for parsing away from this process."""
+        return {key: stored[0] for key, stored in self.previous.items()}
+
+    def lookup(self, entry):
+        """Return (key, digest, stored article or None) and count the entry."""
+        return self.match(entry_key(entry), content_hash(entry))
+
+    def match(self, key, digest):
+        """lookup() for an already computed key and content hash."""
+        stored = self.previous.get(key)
+        if stored and stored[0] == digest:
+            self.counts['reused'] += 1
+            return key, digest, stored[1]
+        self.counts['changed' if stored else 'new'] += 1
+        return key, digest, None
+
+    def keep(self, key, digest, article):
+        self.current[key] = (digest, article)
+
+    def commit(self):
+        """Replace the source's index with this refresh's entries (drops ones that fell off the feed)."""
+        with _lock:
+            _index[self.source_name] = self.current
+            _refresh_stats[self.source_name] = {**self.counts, 'time': time.time()}
+
+def refresh_stats():
+    """Per-source {'new', 'changed', 'reused', 'time'} from each source's latest refresh."""
+    with _lock:
+        return {name: dict(stats) for name, stats in _refresh_stats.items()}
@@ -0,0 +1,203 @@
+import concurrent.futures
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+import http_cache
+import http_pool
+from config import HTTP_CACHE_DIR, HEDGE_DELAY
+
+# Hedged fetch across cloudscraper / requests / curl. Per host we remember which
+# method last worked and its latency, try that one first, and if it has not
+# answered within the hedge delay we race the next method against it.
+
+STATS_FILE = os.path.join(HTTP_CACHE_DIR, "fetch_stats.json")
+DEFAULT_ORDER = ["cloudscraper", "requests", "curl"]
+EWMA_ALPHA = 0.3
+
+_lock = threading.Lock()
+_stats = None
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=64, thread_name_prefix="hedge")
+
+# --- FETCH METHODS ---
+# Each returns (body or None if this method did not get the feed, HTTP status).
+
+def _accept(url, status_code, body, headers):
+    if status_code == 304:
+        return http_cache.cached_body(url)
+    if status_code == 200 and body:
+        http_cache.store(url, body, headers)
+        return body
+    return None
+
+def _via_cloudscraper(url, cond_headers):
+    """Best for Cloudflare."""
+    scraper = http_pool.get_scraper(url)
+    response = scraper.get(url, headers=cond_headers, timeout=15)
+    body = _accept(url, response.status_code, response.content, response.headers)
+    if body is not None and response.status_code == 200:
+        http_pool.remember_clearance(url, scraper)
+    return body, response.status_code
+
+def _via_requests(url, cond_headers):
+    """Standard keep-alive session."""
+    response = http_pool.get_session().get(url, headers=cond_headers, timeout=10)
+    return _accept(url, response.status_code, response.content, response.headers), response.status_code
+
+def _curl_headers(out):
+    """Split curl -D - output into (validator headers of the final response, rest)."""
+    headers = {}
+    # One header block per response (redirects, 100 Continue); the body follows the last
+    while out.startswith(b"HTTP/"):
+        block, _, out = out.partition(b"\r\n\r\n")
+        headers = {}
+        for line in block.decode("latin-1").split("\r\n")[1:]:
+            name, _, value = line.partition(":")
+            if name.strip().lower() in ("etag", "last-modified"):
+                headers["ETag" if name.strip().lower() == "etag" else "Last-Modified"] = value.strip()
+    return headers, out
+
+def _via_curl(url, cond_headers):
+    """Last resort: system curl."""
+    cmd = ["curl", "-L", "-A", "Mozilla/5.0", "-D", "-", "-w", "\n%{http_code}"]
+    for name, value in cond_headers.items():
+        cmd += ["-H", f"{name}: {value}"]
+    result = subprocess.run(cmd + [url], capture_output=True, timeout=15)
+    if result.returncode != 0 or not result.stdout:
+        return None, None
+    out, _, status = result.stdout.rpartition(b"\n")
+    status_code = int(status.strip() or 0)
+    headers, body = _curl_headers(out)
+    return _accept(url, status_code, body, headers), status_code
+
+METHODS = {
+    "cloudscraper": _via_cloudscraper,
+    "requests": _via_requests,
+    "curl": _via_curl,
+}
+
+# --- PER-HOST STATS ---
+def _load_stats():
+    global _stats
+    if _stats is None:
+        try:
+            with open(STATS_FILE, "r") as f:
+                _stats = json.load(f)
+        except (OSError, ValueError):
+            _stats = {}
+    return _stats
+
+def _save_stats():
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        # Unique temp name: the poller and the UI process may save at the same time
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(STATS_FILE), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(_stats, f)
+            os.replace(tmp_path, STATS_FILE)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+    except Exception as e:
+        print(f"[Fetch stats] Could not persist: {e}")
+
+def _record(host, method, ok, latency):
+    with _lock:
+        host_stats = _load_stats().setdefault(host, {'last_success': None, 'methods': {}})
+        m = host_stats['methods'].setdefault(method, {'ok': 0, 'fail': 0, 'latency': None})
+        m['ok' if ok else 'fail'] += 1
+        if ok:
+            m['latency'] = latency if m['latency'] is None else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * m['latency']
+            host_stats['last_success'] = method
+        _save_stats()
+
+def method_order(host):
+    """Methods to try for host: last winner first, then by success rate, then the default order."""
+    with _lock:
+        host_stats = _load_stats().get(host)
+    if not host_stats:
+        return list(DEFAULT_ORDER)
+
+    def rank(method):
+        m = host_stats['methods'].get(method, {'ok': 0, 'fail': 0})
+        attempts = m['ok'] + m['fail']
+        success_rate = m['ok'] / attempts if attempts else 0.5
+        return (method != host_stats.get('last_success'), -success_rate, DEFAULT_ORDER.index(method))
+    return sorted(DEFAULT_ORDER, key=rank)
+
+def _hedge_delay(host, method):
+    """Wait roughly twice the method's usual latency for this host, capped at HEDGE_DELAY."""
+    with _lock:
+        m = _load_stats().get(host, {}).get('methods', {}).get(method)
+    if m and m.get('latency'):
+        return min(HEDGE_DELAY, max(0.5, 2 * m['latency']))
+    return HEDGE_DELAY
+
+def host_stats():
+    """Snapshot of the persisted per-host method stats."""
+    with _lock:
+        return json.loads(json.dumps(_load_stats()))
+
+# --- HEDGED FETCH ---
+def _timed(method, url, cond_headers):
+    """Run one method: (body, latency, status, error)."""
+    started = time.monotonic()
+    status = error = None
+    try:
+        body, status = METHODS[method](url, cond_headers)
+    except Exception as e:
+        print(f"[{method}] Failed for {url}: {e}")
+        body, error = None, str(e)
+    return body, time.monotonic() - started, status, error
+
+def fetch(url, hedge=True, report=None):
+    """
+    Fetch url, racing fallback methods. Returns (body, method) or (None, None).
+    With hedge=False methods run strictly one after another in learned order.
+    If a report dict is given it is filled with the HTTP 'status' and 'error'
+    of the winning (or last failed) attempt, the winning 'method' and the
+    number of 'attempts'.
+    """
+    if report is None:
+        report = {}
+    report.update(method=None, status=None, error=None, attempts=0)
+    host = urlsplit(url).hostname or ""
+    cond_headers = http_cache.conditional_headers(url)
+    remaining = method_order(host)
+    pending = {}
+
+    def launch():
+        method = remaining.pop(0)
+        pending[_executor.submit(_timed, method, url, cond_headers)] = method
+        report['attempts'] += 1
+
+    launch()
+    while pending:
+        if hedge and remaining:
+            newest = list(pending.values())[-1]
+            timeout = _hedge_delay(host, newest)
+        else:
+            timeout = None
+        done, _ = concurrent.futures.wait(pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED)
+        if not done:
+            launch()
+            continue
+        for future in done:
+            method = pending.pop(future)
+            body, latency, status, error = future.result()
+            _record(host, method, body is not None, latency)
+            report.update(status=status, error=error or (None if body is not None else f"HTTP {status}" if status else "no response"))
+            if body is not None:
+                report['method'] = method
+                # Losers keep running; still learn from how they end up doing
+                for loser, loser_method in pending.items():
+                    loser.add_done_callback(lambda f, m=loser_method: _record(host, m, f.result()[0] is not None, f.result()[1]))
+                return body, method
+        # Everything that finished failed: start the next method without waiting
+        if remaining:
+            launch()
+    return None, None
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from config import HTTP_CACHE_DIR
+
+# On-disk HTTP cache keyed by feed URL. Each entry is a pair of files:
+#   <sha1(url)>.json  -> validators (ETag / Last-Modified) and metadata
+#   <sha1(url)>.body  -> raw response body
+# Lives outside st.cache_data so it survives restarts and "Refresh Radar".
+
+_lock = threading.Lock()
+
+def _paths(url):
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(HTTP_CACHE_DIR, key + ".json"), os.path.join(HTTP_CACHE_DIR, key + ".body")
+
+def _atomic_write(path, data):
+    """Write bytes to path via a temp file + rename so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _load_meta(url):
+    meta_path, _ = _paths(url)
+    try:
+        with open(meta_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def get_cached(url):
+    """Return {'etag', 'last_modified', 'body'} for url, or None if nothing is cached."""
+    meta = _load_meta(url)
+    if meta is None:
+        return None
+    _, body_path = _paths(url)
+    try:
+        with open(body_path, "rb") as f:
+            meta['body'] = f.read()
+        return meta
+    except (OSError, ValueError):
+        return None
+
+def conditional_headers(url):
+    """
+    Build If-None-Match / If-Modified-Since headers from the cached validators.
+    None without a cached body: a 304 would leave nothing to serve.
+    """
+    meta = _load_meta(url)
+    headers = {}
+    if meta and os.path.exists(_paths(url)[1]):
+        if meta.get('etag'): headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'): headers['If-Modified-Since'] = meta['last_modified']
+    return headers
+
+def store(url, body, response_headers=None):
+    """Persist a fresh 200 response body together with its validators."""
+    response_headers = response_headers or {}
+    meta = {
+        'url': url,
+        'etag': response_headers.get('ETag'),
+        'last_modified': response_headers.get('Last-Modified'),
+    }
+    meta_path, body_path = _paths(url)
+    try:
+        with _lock:
+            _atomic_write(body_path, body)
+            _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+    except Exception as e:
+        print(f"[HTTP cache] Could not store {url}: {e}")
+
+def cached_body(url):
+    """Body to serve for a 304 Not Modified response."""
+    cached = get_cached(url)
+    return cached['body'] if cached else None
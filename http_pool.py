@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+from config import HTTP_CACHE_DIR, HTTP_POOL_HOSTS, HTTP_POOL_MAXSIZE, BROWSER_USER_AGENT
+
+# Shared HTTP layer for the fetch thread pool. One cloudscraper per host keeps
+# that host's Cloudflare clearance cookie and keep-alive connections; plain
+# requests go through a single pooled session. cloudscraper and requests are
+# imported when the first session is created.
+
+CLEARANCE_FILE = os.path.join(HTTP_CACHE_DIR, "cf_clearance.json")
+
+_lock = threading.Lock()
+_scrapers = {}
+_session = None
+_clearance = None
+
+def _host(url):
+    return urlsplit(url).hostname or ""
+
+def _load_clearance():
+    global _clearance
+    if _clearance is None:
+        try:
+            with open(CLEARANCE_FILE, "r") as f:
+                _clearance = json.load(f)
+        except (OSError, ValueError):
+            _clearance = {}
+    return _clearance
+
+def _save_clearance():
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        # Unique temp name: the poller and the UI process may save at the same time
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(CLEARANCE_FILE), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(_clearance, f)
+            os.replace(tmp_path, CLEARANCE_FILE)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+    except Exception as e:
+        print(f"[HTTP pool] Could not persist clearance cookies: {e}")
+
+def get_scraper(url):
+    """Return the shared cloudscraper for url's host, creating it on first use."""
+    host = _host(url)
+    with _lock:
+        scraper = _scrapers.get(host)
+        if scraper is None:
+            import cloudscraper
+            from cloudscraper import CipherSuiteAdapter
+            from requests.adapters import HTTPAdapter
+            scraper = cloudscraper.create_scraper()
+            # Keep cloudscraper's TLS fingerprint but size the pool for concurrent feeds
+            tls_adapter = scraper.adapters['https://']
+            scraper.mount('https://', CipherSuiteAdapter(
+                ssl_context=tls_adapter.ssl_context,
+                pool_connections=HTTP_POOL_HOSTS,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+            ))
+            scraper.mount('http://', HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_MAXSIZE))
+
+            # Reuse a still-valid clearance cookie (it is bound to the User-Agent that solved it)
+            saved = _load_clearance().get(host)
+            if saved and saved.get('expires', 0) > time.time():
+                scraper.headers['User-Agent'] = saved['user_agent']
+                scraper.cookies.set('cf_clearance', saved['value'], domain=saved['domain'])
+            _scrapers[host] = scraper
+        return scraper
+
+def remember_clearance(url, scraper):
+    """Persist the cf_clearance cookie a scraper picked up for url's host."""
+    host = _host(url)
+    for cookie in scraper.cookies:
+        if cookie.name != 'cf_clearance' or not host.endswith(cookie.domain.lstrip('.')):
+            continue
+        with _lock:
+            clearance = _load_clearance()
+            saved = clearance.get(host)
+            if saved and saved.get('value') == cookie.value:
+                return
+            clearance[host] = {
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'user_agent': scraper.headers.get('User-Agent', ''),
+                'expires': cookie.expires or time.time() + 1800,
+            }
+            _save_clearance()
+        return
+
+def get_session():
+    """Return the shared keep-alive requests session."""
+    global _session
+    with _lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            _session = requests.Session()
+            _session.headers['User-Agent'] = BROWSER_USER_AGENT
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_MAXSIZE)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+def connection_stats():
+    """
+    Count requests served by new vs reused connections across all shared sessions.
+    Returns {'requests', 'new_connections', 'reused_connections', 'hosts'}.
+    """
+    with _lock:
+        sessions = list(_scrapers.values()) + ([_session] if _session else [])
+    stats = {'requests': 0, 'new_connections': 0, 'reused_connections': 0, 'hosts': {}}
+    seen_adapters = set()
+    for session in sessions:
+        for adapter in session.adapters.values():
+            if id(adapter) in seen_adapters or not hasattr(adapter, 'poolmanager'):
+                continue
+            seen_adapters.add(id(adapter))
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host_stats = stats['hosts'].setdefault(pool.host, {'requests': 0, 'new_connections': 0})
+                host_stats['requests'] += pool.num_requests
+                host_stats['new_connections'] += pool.num_connections
+                stats['requests'] += pool.num_requests
+                stats['new_connections'] += pool.num_connections
+    stats['reused_connections'] = max(stats['requests'] - stats['new_connections'], 0)
+    return stats
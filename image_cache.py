@@ -0,0 +1,157 @@
+import concurrent.futures
+import glob
+import hashlib
+import io
+import os
+import threading
+import time
+import http_pool
+from config import THUMB_DIR, THUMB_WIDTH, THUMB_CACHE_BYTES, IMAGE_WORKERS, IMAGE_MAX_BYTES, IMAGE_WAIT, IMAGE_RETRY_AFTER
+
+# Local image pipeline for story cards. Publisher images are downloaded once
+# (a few at a time, size-capped, with the article as Referer for hotlink
+# checks), downscaled to card-sized JPEG thumbnails and kept in a disk cache
+# with an LRU byte budget. Cards are then served from local files instead of
+# making every browser re-download multi-MB originals on every page view.
+
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="thumbs")
+_lock = threading.Lock()
+_pending = {}
+_cache_bytes = None
+
+def _path(url, ext=".jpg"):
+    return os.path.join(THUMB_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest() + ext)
+
+def _download(url, referer):
+    headers = {'Referer': referer} if referer else {}
+    with http_pool.get_session().get(url, headers=headers, timeout=10, stream=True) as response:
+        response.raise_for_status()
+        if int(response.headers.get('Content-Length') or 0) > IMAGE_MAX_BYTES:
+            raise ValueError("image too large")
+        body = bytearray()
+        for chunk in response.iter_content(64 * 1024):
+            body.extend(chunk)
+            if len(body) > IMAGE_MAX_BYTES:
+                raise ValueError("image too large")
+    return bytes(body)
+
+def _downscale(body):
+    from PIL import Image, ImageOps
+    with Image.open(io.BytesIO(body)) as img:
+        img.draft("RGB", (THUMB_WIDTH, THUMB_WIDTH))  # JPEGs decode straight at a reduced scale
+        thumb = ImageOps.exif_transpose(img).convert("RGB")
+    thumb.thumbnail((THUMB_WIDTH, THUMB_WIDTH * 2))
+    out = io.BytesIO()
+    thumb.save(out, "JPEG", quality=80, optimize=True, progressive=True)
+    return out.getvalue()
+
+def _account(added):
+    """Track the cache's size and evict least recently used thumbnails once it is over budget."""
+    global _cache_bytes
+    with _lock:
+        if _cache_bytes is None:
+            _cache_bytes = sum(os.path.getsize(p) for p in glob.glob(os.path.join(THUMB_DIR, "*.jpg")))
+        _cache_bytes += added
+        if _cache_bytes <= THUMB_CACHE_BYTES:
+            return
+        entries = []
+        for path in glob.glob(os.path.join(THUMB_DIR, "*.jpg")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        _cache_bytes = sum(size for _, size, _ in entries)
+        # Evict down to 90% so a busy page does not trigger a scan per image
+        for _, size, path in entries:
+            if _cache_bytes <= THUMB_CACHE_BYTES * 0.9:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            _cache_bytes -= size
+
+def _build(url, referer):
+    try:
+        thumb = _downscale(_download(url, referer))
+    except Exception as e:
+        print(f"[Thumbs] {url}: {e}")
+        # Remember the failure so every page view does not retry it
+        try:
+            with open(_path(url, ".fail"), "w"):
+                pass
+        except OSError:
+            pass
+        return None
+    path = _path(url)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(thumb)
+    os.replace(tmp_path, path)
+    _account(len(thumb))
+    return path
+
+def cached(url):
+    """Local thumbnail path if url is cached (and marks it recently used), else None."""
+    path = _path(url)
+    try:
+        os.utime(path)
+        return path
+    except OSError:
+        return None
+
+def _submit(url, referer):
+    """Future for url's thumbnail path (None on failure); concurrent requests share one download."""
+    with _lock:
+        future = _pending.get(url)
+        if future is None:
+            future = _pending[url] = _executor.submit(_build, url, referer)
+            future.add_done_callback(lambda _: _pending.pop(url, None))
+    return future
+
+def _missing(stories):
+    os.makedirs(THUMB_DIR, exist_ok=True)
+    found, todo = {}, {}
+    for story in stories:
+        url = story.image
+        if not url or url in found or url in todo:
+            continue
+        path = cached(url)
+        if path:
+            found[url] = path
+            continue
+        try:
+            if time.time() - os.path.getmtime(_path(url, ".fail")) < IMAGE_RETRY_AFTER:
+                continue
+        except OSError:
+            pass
+        todo[url] = story.link
+    return found, todo
+
+def thumbnails(stories, wait=IMAGE_WAIT):
+    """
+    {image url: local thumbnail path} for a page of stories. Missing thumbnails
+    are fetched concurrently; those not ready within `wait` seconds (by default
+    none: the page never blocks) or that failed are left out, so the caller
+    falls back to the original URL, and finish in the background.
+    """
+    found, todo = _missing(stories)
+    futures = {_submit(url, referer): url for url, referer in todo.items()}
+    done, _ = concurrent.futures.wait(futures, timeout=wait)
+    for future in done:
+        try:
+            path = future.result()
+        except Exception as e:
+            print(f"[Thumbs] {futures[future]}: {e}")
+            continue
+        if path:
+            found[futures[future]] = path
+    return found
+
+def prefetch(stories):
+    """Start building thumbnails for stories (e.g. the next page) without waiting."""
+    _, todo = _missing(stories)
+    for url, referer in todo.items():
+        _submit(url, referer)
@@ -0,0 +1,151 @@
+import concurrent.futures
+import hashlib
+import itertools
+import os
+import random
+import sqlite3
+import threading
+import time
+from config import (GEMINI_MODEL, GEMINI_BASE_URL, LLM_CACHE_DB, LLM_CONCURRENCY, LLM_REQUESTS_PER_MINUTE,
+                    LLM_BURST, LLM_MAX_RETRIES, LLM_BACKOFF)
+
+# Gemini service layer: one client per API key, a persistent prompt-hash ->
+# response cache, a shared requests-per-minute limiter, retry with backoff,
+# bounded parallel generation and token streaming. RADAR_GEMINI_BASE_URL
+# points it at a local fake endpoint (benchmarks/fake_gemini.py). The SDK is
+# imported on the first call, so sessions that never draft skip its import.
+
+RETRY_CODES = {429, 500, 502, 503, 504}
+
+_lock = threading.Lock()
+_clients = {}
+_db = None
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=LLM_CONCURRENCY, thread_name_prefix="llm")
+
+def get_client(api_key):
+    """Shared client for api_key (keeps its HTTP connection pool across calls)."""
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            from google import genai
+            http_options = {'base_url': GEMINI_BASE_URL} if GEMINI_BASE_URL else None
+            client = _clients[api_key] = genai.Client(api_key=api_key, http_options=http_options)
+        return client
+
+# --- RESPONSE CACHE ---
+def _key(prompt, model):
+    return hashlib.sha256(f"{model}\x1f{prompt}".encode("utf-8")).hexdigest()
+
+def _get_db():
+    global _db
+    if _db is None:
+        os.makedirs(os.path.dirname(LLM_CACHE_DB) or ".", exist_ok=True)
+        _db = sqlite3.connect(LLM_CACHE_DB, check_same_thread=False, timeout=30)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, model TEXT, response TEXT, created REAL)")
+    return _db
+
+def cached(prompt, model=GEMINI_MODEL):
+    """Stored response for this exact prompt, or None."""
+    try:
+        with _lock:
+            row = _get_db().execute("SELECT response FROM responses WHERE key = ?", (_key(prompt, model),)).fetchone()
+        return row[0] if row and row[0] else None  # Empty rows stored by older versions count as misses
+    except sqlite3.Error as e:
+        print(f"[LLM] Cache read failed: {e}")
+        return None
+
+def _store(prompt, model, text):
+    if not text:
+        return  # Blocked or cut-off reply: ask again next time rather than serve "" forever
+    try:
+        with _lock:
+            db = _get_db()
+            with db:
+                db.execute("INSERT OR REPLACE INTO responses (key, model, response, created) VALUES (?, ?, ?, ?)",
+                           (_key(prompt, model), model, text, time.time()))
+    except sqlite3.Error as e:
+        print(f"[LLM] Cache write failed: {e}")
+
+# --- RATE LIMIT / RETRY ---
+class RateLimiter:
+    """Token bucket: `burst` calls back to back, then `per_minute` on average."""
+
+    def __init__(self, per_minute, burst):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+limiter = RateLimiter(LLM_REQUESTS_PER_MINUTE, LLM_BURST)
+
+def _with_retry(call):
+    """Run call() under the rate limit, retrying throttling, server and network errors."""
+    import httpx
+    from google.genai import errors
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        limiter.acquire()
+        try:
+            return call()
+        except errors.APIError as e:
+            if e.code not in RETRY_CODES or attempt == LLM_MAX_RETRIES:
+                raise
+            reason = f"HTTP {e.code}"
+        except httpx.TransportError as e:
+            if attempt == LLM_MAX_RETRIES:
+                raise
+            reason = type(e).__name__
+        delay = LLM_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5)
+        print(f"[LLM] {reason}, retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+# --- GENERATION ---
+def generate(api_key, prompt, model=GEMINI_MODEL):
+    """Response text for prompt, from the cache when this prompt was answered before."""
+    text = cached(prompt, model)
+    if text is None:
+        client = get_client(api_key)
+        text = _with_retry(lambda: client.models.generate_content(model=model, contents=prompt)).text or ""
+        _store(prompt, model, text)
+    return text
+
+def generate_many(api_key, prompts, model=GEMINI_MODEL):
+    """Responses for several prompts, LLM_CONCURRENCY at a time. Failed ones come back as "Error: ..."."""
+    def one(prompt):
+        try:
+            return generate(api_key, prompt, model)
+        except Exception as e:
+            return f"Error: {str(e)}"
+    return list(_executor.map(one, prompts))
+
+def stream(api_key, prompt, model=GEMINI_MODEL):
+    """Yield the response in chunks as Gemini produces them (all at once on a cache hit); caches the full text."""
+    text = cached(prompt, model)
+    if text is not None:
+        yield text
+        return
+    client = get_client(api_key)
+
+    def open_stream():
+        # The request is only sent on the first next(), so retry up to the first chunk
+        chunks = client.models.generate_content_stream(model=model, contents=prompt)
+        return next(chunks, None), chunks
+
+    first, chunks = _with_retry(open_stream)
+    parts = []
+    for chunk in itertools.chain([first] if first is not None else [], chunks):
+        if chunk.text:
+            parts.append(chunk.text)
+            yield chunk.text
+    _store(prompt, model, "".join(parts))
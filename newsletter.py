@@ -0,0 +1,139 @@
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import llm
+from config import FEEDS_BY_REGION, GEMINI_MODEL, LLM_CACHE_DB, LLM_CONCURRENCY, NEWSLETTER_BATCH, NEWSLETTER_PROMPT_MAX, NEWSLETTER_WORDS
+
+# Map-reduce newsletter. Queued stories are merged by near-duplicate cluster
+# and grouped by region; the stories are turned into one-sentence notes by
+# batched Gemini calls run in parallel (map), and the briefing is composed
+# from those notes (reduce). Notes are cached per story, so adding a story to
+# the queue only maps that story. The extra round trip is slower than one
+# prompt at every queue size measured, so map-reduce is only there to bound the
+# prompt: summaries go straight into the composing prompt unless that prompt
+# would be longer than NEWSLETTER_PROMPT_MAX characters.
+
+REGION_OF = {name: region for region, feeds in FEEDS_BY_REGION.items() for name in feeds}
+_JSON_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+
+_lock = threading.Lock()
+_db = None
+
+# --- NOTE CACHE ---
+def _note_key(story, model):
+    raw = "\x1f".join([model, story.link, story.title, story.summary])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _get_db():
+    global _db
+    if _db is None:
+        os.makedirs(os.path.dirname(LLM_CACHE_DB) or ".", exist_ok=True)
+        _db = sqlite3.connect(LLM_CACHE_DB, check_same_thread=False, timeout=30)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.execute("CREATE TABLE IF NOT EXISTS story_notes (key TEXT PRIMARY KEY, note TEXT, created REAL)")
+    return _db
+
+def _cached_notes(stories, model):
+    keys = {_note_key(s, model): s.link for s in stories}
+    if not keys:
+        return {}
+    try:
+        with _lock:
+            rows = _get_db().execute(f"SELECT key, note FROM story_notes WHERE key IN ({','.join('?' * len(keys))})", list(keys)).fetchall()
+        return {keys[key]: note for key, note in rows}
+    except sqlite3.Error as e:
+        print(f"[Newsletter] Note cache read failed: {e}")
+        return {}
+
+def _store_notes(stories, notes, model):
+    rows = [(_note_key(s, model), notes[s.link], time.time()) for s in stories if s.link in notes]
+    try:
+        with _lock:
+            db = _get_db()
+            with db:
+                db.executemany("INSERT OR REPLACE INTO story_notes (key, note, created) VALUES (?, ?, ?)", rows)
+    except sqlite3.Error as e:
+        print(f"[Newsletter] Note cache write failed: {e}")
+
+# --- MAP ---
+def group_stories(stories):
+    """{region: [(story, [sources of its near-duplicates])]}, one entry per cluster, queue order kept."""
+    groups, seen = {}, {}
+    for story in stories:
+        cluster = story.cluster_id or story.link
+        if cluster in seen:
+            seen[cluster][1].append(story.source)
+            continue
+        entry = seen[cluster] = (story, [])
+        groups.setdefault(REGION_OF.get(story.source, "Other"), []).append(entry)
+    return groups
+
+def _map_prompt(batch):
+    lines = [f"[{i}] {s.title} ({s.source}): {s.summary[:1000]}" for i, s in enumerate(batch)]
+    return ("For each story below write a one-sentence note for a newsletter editor, keeping names, figures and places. "
+            'Reply with a JSON array of objects {"id": <number in brackets>, "note": "..."}.\n\n' + "\n".join(lines))
+
+def _parse_notes(text, batch):
+    match = _JSON_ARRAY_RE.search(text or "")
+    try:
+        items = json.loads(match.group(0)) if match else []
+    except ValueError:
+        items = []
+    notes = {}
+    for item in items:
+        if isinstance(item, dict) and isinstance(item.get('id'), int) and 0 <= item['id'] < len(batch) and item.get('note'):
+            notes[batch[item['id']].link] = str(item['note']).strip()
+    return notes
+
+def story_notes(api_key, groups, model=GEMINI_MODEL):
+    """
+    {link: note} for every grouped story: cached notes first, the rest mapped
+    in parallel batches taken in region order. Stories the model skipped fall
+    back to their own summary (and are retried next time).
+    """
+    stories = [story for entries in groups.values() for story, _ in entries]
+    notes = _cached_notes(stories, model)
+    missing = [story for story in stories if story.link not in notes]
+    # Batches grow with the queue so they all fit in one parallel wave
+    size = max(NEWSLETTER_BATCH, math.ceil(len(missing) / LLM_CONCURRENCY))
+    batches = [missing[i:i + size] for i in range(0, len(missing), size)]
+    if batches:
+        for batch, text in zip(batches, llm.generate_many(api_key, [_map_prompt(b) for b in batches], model)):
+            mapped = _parse_notes(text, batch)
+            if not mapped:
+                print(f"[Newsletter] No notes for a batch of {len(batch)}: {text[:120]}")
+            _store_notes(batch, mapped, model)
+            notes.update(mapped)
+    return {**summary_notes(groups), **notes}
+
+def summary_notes(groups):
+    """{link: summary excerpt}: the notes of a story that was not mapped."""
+    return {story.link: story.summary[:300] for entries in groups.values() for story, _ in entries}
+
+# --- REDUCE ---
+def compose_prompt(groups, notes):
+    sections = []
+    for region, entries in groups.items():
+        bullets = []
+        for story, also in entries:
+            sources = story.source + (f", also {', '.join(sorted(set(also)))}" if also else "")
+            bullets.append(f"- {story.title} ({sources}): {notes[story.link]}")
+        sections.append(f"## {region}\n" + "\n".join(bullets))
+    return (f"Write a Morning Briefing newsletter from these story notes, in under {NEWSLETTER_WORDS} words.\n"
+            "Format: Intro, one section per region with bullet points, Closing thought.\n\n" + "\n\n".join(sections))
+
+def generate_newsletter(api_key, stories, model=GEMINI_MODEL):
+    """
+    Briefing for the queued stories: one composing call over their summaries,
+    or, when that prompt would be too long, over parallel per-story notes (cached).
+    """
+    groups = group_stories(stories)
+    prompt = compose_prompt(groups, summary_notes(groups))
+    if len(prompt) > NEWSLETTER_PROMPT_MAX:
+        prompt = compose_prompt(groups, story_notes(api_key, groups, model))
+    return llm.generate(api_key, prompt, model)
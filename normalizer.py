@@ -0,0 +1,102 @@
+import re
+import time
+from contextlib import nullcontext
+
+# Single-pass entry normaliser. One scan of the summary HTML with a
+# precompiled tag tokenizer yields the plain-text summary and the first
+# inline <img>; the feed's media fields and the published date are read
+# alongside. The tokenizer never looks past the next "<", so malformed markup
+# costs linear time. Publisher quirks live in SOURCE_RULES.
+
+# Per-source rules:
+#   cut_at_stray_lt - the feed truncates markup mid-tag; drop text from a leftover "<"
+#   drop            - trailing boilerplate to remove from the summary
+SOURCE_RULES = {
+    "The Guardian": {'cut_at_stray_lt': True, 'drop': ("Continue reading...",)},
+    "Mail & Guardian": {'cut_at_stray_lt': True},
+}
+_NO_RULES = {}
+
+# Possessive quantifiers (Python 3.11+) keep a failed tag from being retried with a shorter name
+_TOKEN_RE = re.compile(r"<(?:(/?)([a-zA-Z][\w:-]*+)([^<>]*+)>|!--[^<]*?-->)")
+_SRC_RE = re.compile(r"""\bsrc\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE)
+_SKIP_TAGS = frozenset(("script", "style"))
+_BLOCK_TAGS = frozenset(("p", "br", "div", "li", "ul", "ol", "h1", "h2", "h3", "h4", "blockquote", "figure", "figcaption", "tr", "td"))
+
+def scan_html(html, cut_at_stray_lt=False):
+    """Return (plain text, first <img> src or None) from one pass over an HTML fragment."""
+    if "<" not in html:
+        return " ".join(html.split()), None
+    parts, image, pos, skipping = [], None, 0, None
+    for match in _TOKEN_RE.finditer(html):
+        if skipping is None:
+            parts.append(html[pos:match.start()])
+        pos = match.end()
+        name = match.group(2)
+        if not name:
+            continue  # Comment
+        name = name.lower()
+        if skipping:
+            if match.group(1) and name == skipping:
+                skipping = None
+        elif match.group(1):
+            if name in _BLOCK_TAGS:
+                parts.append(" ")
+        elif name in _SKIP_TAGS:
+            skipping = name
+        elif name == "img":
+            if image is None:
+                src = _SRC_RE.search(match.group(3))
+                if src:
+                    image = src.group(1) or src.group(2) or src.group(3)
+        elif name in _BLOCK_TAGS:
+            parts.append(" ")
+    if skipping is None:
+        parts.append(html[pos:])
+    text = "".join(parts)
+    if cut_at_stray_lt and "<" in text:
+        text = text.split("<")[0]
+    return " ".join(text.split()), image
+
+def _media_image(entry):
+    for media in entry.get('media_content') or ():
+        if media.get('medium') == 'image' or media.get('type', '').startswith('image'):
+            return media.get('url')
+    thumbnails = entry.get('media_thumbnail')
+    if thumbnails:
+        return thumbnails[0].get('url')
+    for enclosure in entry.get('enclosures') or ():
+        if enclosure.get('type', '').startswith('image'):
+            return enclosure.get('href')
+    return None
+
+def _no_timer(name):
+    return nullcontext()
+
+def normalize_entry(entry, source_name, timer=_no_timer):
+    """
+    Derived fields of a feedparser entry: {'summary', 'image', 'timestamp'}.
+    Media fields win over an inline <img>, as before. Display dates are
+    derived from the timestamp when rendered (article.Article).
+    timer(step) wraps the 'strip', 'image' and 'date' steps (pipeline.stage).
+    """
+    rules = SOURCE_RULES.get(source_name, _NO_RULES)
+    raw = entry.get('summary')
+    with timer("strip"):
+        if raw is None:
+            summary, inline_image = 'No summary.', None
+        else:
+            summary, inline_image = scan_html(raw, rules.get('cut_at_stray_lt', False))
+            for boilerplate in rules.get('drop', ()):
+                if summary.endswith(boilerplate):
+                    summary = summary[:-len(boilerplate)].rstrip()
+    with timer("image"):
+        image = _media_image(entry) or inline_image
+    with timer("date"):
+        published = entry.get('published_parsed')
+        timestamp = time.mktime(published) if published else 0
+    return {
+        'summary': summary,
+        'image': image,
+        'timestamp': timestamp,
+    }
@@ -0,0 +1,64 @@
+import streamlit as st
+import telemetry
+from utils import relative_time_from_ts
+
+# --- CONFIGURATION ---
+st.set_page_config(page_title="Source Health", layout="wide", page_icon="🩺")
+
+st.title("Source Health")
+st.caption("Per-source fetch telemetry from the poller and inline scans. Sources at the top dominate scan latency.")
+
+sources = telemetry.snapshot()
+if not sources:
+    st.info("No fetches recorded yet. Run a scan from the radar page or start `python poller.py`.")
+    st.stop()
+
+# --- SUMMARY ---
+total_time = sum(s['latency_sum'] for s in sources) or 1.0
+total_fetches = sum(s['fetches'] for s in sources)
+slowest = max(sources, key=lambda s: s['mean_latency'])
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Sources", len(sources))
+c2.metric("Refreshes", total_fetches)
+c3.metric("Failure rate", f"{sum(s['failures'] for s in sources) / max(total_fetches, 1):.1%}")
+c4.metric("Slowest (mean)", slowest['source'], f"{slowest['mean_latency']:.2f}s", delta_color="off")
+
+# --- PER SOURCE ---
+def _bound(seconds):
+    return f"≤ {seconds:g}s" if seconds is not None else "> max"
+
+ranked = sorted(sources, key=lambda s: s['latency_sum'], reverse=True)
+rows = []
+for s in ranked:
+    rows.append({
+        "Source": s['source'],
+        "Share of scan time": f"{s['latency_sum'] / total_time:.1%}",
+        "Mean (s)": round(s['mean_latency'], 2),
+        "p50": _bound(s['p50_latency']),
+        "p95": _bound(s['p95_latency']),
+        "Refreshes": s['fetches'],
+        "Failure rate": f"{s['failure_rate']:.0%}",
+        "Last method": s['last_method'] or "—",
+        "Last status": s['last_status'] or "—",
+        "Last size (KB)": round((s['last_bytes'] or 0) / 1024, 1),
+        "Entries": s['last_entries'] or 0,
+        "Parse errors": s['parse_errors'],
+        "Last refresh": relative_time_from_ts(s['last_fetch']),
+        "Last error": s['last_error'] or s['last_parse_error'] or "",
+    })
+st.dataframe(rows, width="stretch", hide_index=True)
+
+st.markdown("### ⏱️ Total fetch time by source")
+st.bar_chart([{"Source": s['source'], "Seconds": round(s['latency_sum'], 2)} for s in ranked[:15]], x="Source", y="Seconds", horizontal=True)
+
+# --- EXPORT ---
+metrics = telemetry.export()
+c_dl, c_reset = st.columns([3, 1])
+with c_dl:
+    st.download_button("⬇️ Prometheus metrics", metrics, file_name="radar_metrics.prom", mime="text/plain")
+with c_reset:
+    if st.button("🗑️ Reset telemetry"):
+        telemetry.reset()
+        st.rerun()
+with st.expander("Prometheus text format"):
+    st.code(metrics, language="text")
@@ -0,0 +1,226 @@
+import concurrent.futures
+import math
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import partial
+from clustering import article_signature
+from config import PARSE_WORKERS, PARSE_BATCH
+from entry_index import entry_key, content_hash
+from normalizer import normalize_entry
+from tagger import tag_article
+
+# Ingestion stages. Fetching (network I/O) stays on the caller's threads or
+# event loop; parsing and enrichment (feedparser, normalization, country
+# tags, near-duplicate signatures) run in a process pool so that CPU work
+# does not serialize on the GIL. Sentiment is scored at ingest, after
+# clustering, so near-duplicates reuse their cluster's label. A dispatcher
+# thread hands feed bodies to the pool in batches. Each stage's queue depth,
+# item count and time are counted (stats(), and export() for Prometheus).
+
+# parse covers strip/image/date (per entry, in the workers), ingest covers sentiment
+STAGES = ("fetch", "parse", "strip", "image", "date", "ingest", "sentiment")
+
+_lock = threading.Lock()
+_pool = None
+_dispatcher = None
+_handoff = queue.Queue()
+_stages = {name: {'depth': 0, 'max_depth': 0, 'items': 0, 'seconds': 0.0} for name in STAGES}
+_batches = {'batches': 0, 'items': 0, 'worker_seconds': 0.0}
+
+# --- CPU STAGE (worker processes) ---
+def parse_entries(feed, source_name, known):
+    """
+    Enrich the first 10 entries of a parsed feed. Entries whose key and
+    content hash are in `known` ({key: digest}, from the previous refresh)
+    are unchanged and come back as (key, digest, None); the others as
+    (key, digest, article) with tags and signature set.
+    """
+    entries = []
+    for entry in feed.entries[:10]:
+        key, digest = entry_key(entry), content_hash(entry)
+        if known.get(key) == digest:
+            entries.append((key, digest, None))
+            continue
+        # Summary text, image and date in one pass (per-source rules in normalizer.py)
+        fields = normalize_entry(entry, source_name, stage)
+        article = {
+            'title': entry.title,
+            'link': entry.link,
+            'summary': fields['summary'],
+            'timestamp': fields['timestamp'],
+            'source': source_name,
+            'image': fields['image'],
+        }
+        tag_article(article)
+        article['signature'] = article_signature(article)
+        entries.append((key, digest, article))
+    bozo = feed.get('bozo_exception')
+    return {
+        'entries': entries,
+        'total': len(feed.entries),
+        'parse_error': f"{type(bozo).__name__}: {bozo}" if bozo else None,
+    }
+
+def _parse_body(body, source_name, known):
+    import feedparser
+    return parse_entries(feedparser.parse(body), source_name, known)
+
+def _run_batch(jobs):
+    """
+    Worker entry point: parse a batch of (body, source_name, known); failures
+    are returned, not raised. Also returns the worker time and the
+    {stage: (items, seconds)} counted in this worker for the batch.
+    """
+    started = time.perf_counter()
+    before = {name: (s['items'], s['seconds']) for name, s in _stages.items()}
+    results = []
+    for job in jobs:
+        try:
+            results.append(_parse_body(*job))
+        except Exception as e:
+            results.append(RuntimeError(f"{type(e).__name__}: {e}"))
+    counted = {name: (s['items'] - before[name][0], s['seconds'] - before[name][1]) for name, s in _stages.items()}
+    return results, time.perf_counter() - started, counted
+
+def _init_worker():
+    import feedparser  # noqa: F401
+
+# --- HAND-OFF ---
+def _get_pool():
+    global _pool, _dispatcher
+    with _lock:
+        if _pool is None:
+            # spawn: forking the threaded app/poller process could copy held locks
+            _pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker)
+        if _dispatcher is None:
+            _dispatcher = threading.Thread(target=_dispatch, daemon=True, name="parse-dispatch")
+            _dispatcher.start()
+        return _pool
+
+def configure(workers):
+    """Set the pool size, if the pool has not started yet (the UI runs a smaller pool than the poller)."""
+    global PARSE_WORKERS
+    with _lock:
+        if _pool is None:
+            PARSE_WORKERS = workers
+
+def warm():
+    """Start the parse workers now rather than on the first feed (no-op when PARSE_WORKERS is 0)."""
+    if PARSE_WORKERS > 0:
+        pool = _get_pool()
+        concurrent.futures.wait([pool.submit(_run_batch, []) for _ in range(PARSE_WORKERS)])
+
+def _reset_pool(pool):
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _dispatch():
+    while True:
+        batch = [_handoff.get()]
+        # Spread what is queued over the workers: fewer round trips, no idle workers
+        size = min(PARSE_BATCH, math.ceil((1 + _handoff.qsize()) / PARSE_WORKERS))
+        while len(batch) < size:
+            try:
+                batch.append(_handoff.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            future = _get_pool().submit(_run_batch, [job for job, _ in batch])
+        except Exception as e:
+            for _, waiter in batch:
+                waiter.set_exception(e)
+            continue
+        future.add_done_callback(partial(_deliver, batch))
+
+def _deliver(batch, future):
+    try:
+        results, seconds, counted = future.result()
+    except Exception as e:
+        for _, waiter in batch:
+            waiter.set_exception(e)
+        return
+    with _lock:
+        _batches['batches'] += 1
+        _batches['items'] += len(batch)
+        _batches['worker_seconds'] += seconds
+        # Step timings from the worker process, so stats() covers them too
+        for name, (items, stage_seconds) in counted.items():
+            _stages[name]['items'] += items
+            _stages[name]['seconds'] += stage_seconds
+    for (_, waiter), result in zip(batch, results):
+        if isinstance(result, Exception):
+            waiter.set_exception(result)
+        else:
+            waiter.set_result(result)
+
+def parse(body, source_name, known):
+    """
+    parse_entries() for a raw feed body, run in the process pool (in this
+    thread when PARSE_WORKERS is 0 or the pool has broken). Blocks until done.
+    """
+    with stage("parse"):
+        if PARSE_WORKERS > 0:
+            pool = _get_pool()
+            waiter = concurrent.futures.Future()
+            _handoff.put(((body, source_name, known), waiter))
+            try:
+                return waiter.result()
+            except BrokenProcessPool as e:
+                print(f"[Pipeline] Parse pool broke ({e}); parsing {source_name} in-process")
+                _reset_pool(pool)
+        return _parse_body(body, source_name, known)
+
+# --- STAGE METRICS ---
+@contextmanager
+def stage(name):
+    """Count one item through a stage: depth while inside, then items and time."""
+    with _lock:
+        s = _stages[name]
+        s['depth'] += 1
+        s['max_depth'] = max(s['max_depth'], s['depth'])
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _lock:
+            s['depth'] -= 1
+            s['items'] += 1
+            s['seconds'] += time.perf_counter() - started
+
+def stats():
+    """{'stages': {stage: {depth, max_depth, items, seconds}}, 'pool': {workers, batches, items, worker_seconds}}."""
+    with _lock:
+        return {
+            'stages': {name: dict(s) for name, s in _stages.items()},
+            'pool': {'workers': PARSE_WORKERS, **_batches},
+        }
+
+def reset_stats():
+    with _lock:
+        for s in _stages.values():
+            s.update(max_depth=s['depth'], items=0, seconds=0.0)
+        _batches.update(batches=0, items=0, worker_seconds=0.0)
+
+def export():
+    """Stage metrics in the Prometheus text format (appended to telemetry.export() by the poller)."""
+    current = stats()
+    lines = []
+    for name, kind, help_text, field in [
+        ("radar_stage_queue_depth", "gauge", "Feeds currently in the stage (waiting or running).", 'depth'),
+        ("radar_stage_queue_depth_max", "gauge", "Highest depth seen.", 'max_depth'),
+        ("radar_stage_items_total", "counter", "Feeds (entries for strip/image/date) that went through the stage.", 'items'),
+        ("radar_stage_seconds_total", "counter", "Time spent in the stage.", 'seconds'),
+    ]:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{stage="{stage_name}"}} {s[field]}' for stage_name, s in current['stages'].items()]
+    lines += ["# HELP radar_parse_batches_total Batches handed to the parse pool.", "# TYPE radar_parse_batches_total counter",
+              f"radar_parse_batches_total {current['pool']['batches']}"]
+    return "\n".join(lines) + "\n"
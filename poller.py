@@ -0,0 +1,135 @@
+"""
+Background ingestion worker. Refreshes every source in config.FEEDS_BY_REGION
+on its own schedule and writes parsed articles to the shared article store, so
+the Streamlit app only has to read. Each source is polled on an adaptive
+interval learned from its publish cadence (see scheduler.py).
+
+    python poller.py              # run forever
+    python poller.py --once       # single refresh of every source, then exit
+    python poller.py --schedule   # print each source's interval and next due time
+    python poller.py --metrics-port 9108   # also serve telemetry at :9108/metrics for Prometheus
+
+Several app replicas can each start a poller: an exclusive lock on
+.cache/feeds/poller.lock makes exactly one of them poll while the others
+stand by and take over if it dies.
+"""
+import argparse
+import concurrent.futures
+import fcntl
+import http.server
+import os
+import threading
+import time
+from datetime import datetime
+from config import FEEDS_BY_REGION, FEED_STORE_DIR, POLL_TICK
+import article_store
+import entry_index
+import pipeline
+import scheduler
+import telemetry
+from services import load_feed_articles
+
+LOCK_FILE = os.path.join(FEED_STORE_DIR, "poller.lock")
+
+def all_feeds():
+    """Unique (name, url) pairs across every region."""
+    feeds = {}
+    for region_feeds in FEEDS_BY_REGION.values():
+        feeds.update(region_feeds)
+    return list(feeds.items())
+
+def poll_sources(feeds):
+    """Fetch the given (name, url) pairs concurrently and update their schedules."""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        future_to_name = {executor.submit(load_feed_articles, url, name): name for name, url in feeds}
+        pending = set(future_to_name)
+        while pending:
+            # Keep checking in during a long poll so the UI does not take the leader for dead
+            article_store.write_heartbeat({'state': 'polling', 'remaining': len(pending)})
+            done, pending = concurrent.futures.wait(pending, timeout=POLL_TICK, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                name = future_to_name[future]
+                try:
+                    articles = future.result()
+                except Exception as e:
+                    print(f"[Poller] {name} failed: {e}")
+                    articles = []
+                # load_feed_articles has already archived them in the article store
+                if articles:
+                    scheduler.record_success(name, articles)
+                else:
+                    scheduler.record_failure(name)
+
+def serve_metrics(port):
+    """Serve telemetry and pipeline stage metrics at /metrics from a daemon thread."""
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = (telemetry.export() + pipeline.export()).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[Poller] Metrics at http://localhost:{port}/metrics")
+
+def acquire_leadership():
+    """Block until this process holds the poller lock; returns the open lock file."""
+    os.makedirs(FEED_STORE_DIR, exist_ok=True)
+    lock_file = open(LOCK_FILE, "w")
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return lock_file
+        except BlockingIOError:
+            time.sleep(POLL_TICK)
+
+def run(once=False):
+    lock_file = acquire_leadership()
+    print(f"[Poller] Leader (pid {os.getpid()})")
+    feeds = all_feeds()
+    last_poll = 0
+    try:
+        while True:
+            due = feeds if once else scheduler.due_sources(feeds)
+            if due:
+                started = time.time()
+                poll_sources(due)
+                last_poll = time.time()
+                stats = entry_index.refresh_stats()
+                counts = {k: sum(stats.get(name, {}).get(k, 0) for name, _ in due) for k in ('new', 'changed', 'reused')}
+                print(f"[Poller] Refreshed {len(due)}/{len(feeds)} sources in {last_poll - started:.1f}s "
+                      f"({counts['new']} new, {counts['changed']} changed, {counts['reused']} reused)")
+            article_store.write_heartbeat({'state': 'idle', 'last_poll': last_poll})
+            if once:
+                return
+            time.sleep(POLL_TICK)
+    finally:
+        lock_file.close()
+
+def print_schedule():
+    for row in scheduler.report():
+        next_due = datetime.fromtimestamp(row['next_due']).strftime("%H:%M:%S")
+        print(f"{row['source']:<28} every {row['interval'] / 60:6.1f} min  next {next_due}  failures {row['failures']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Background feed poller")
+    parser.add_argument("--once", action="store_true", help="refresh every source once and exit")
+    parser.add_argument("--schedule", action="store_true", help="print the learned polling schedule and exit")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port")
+    args = parser.parse_args()
+    if args.schedule:
+        print_schedule()
+    else:
+        if args.metrics_port:
+            serve_metrics(args.metrics_port)
+        run(once=args.once)
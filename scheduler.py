@@ -0,0 +1,106 @@
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from config import FEED_STORE_DIR, POLL_INTERVAL, MIN_POLL_INTERVAL, MAX_POLL_INTERVAL
+
+# Adaptive per-source polling schedule. Each source's interval follows its
+# observed publish cadence: busy feeds are polled more often, feeds that keep
+# returning the same entries back off, and failures back off exponentially.
+
+SCHEDULE_FILE = os.path.join(FEED_STORE_DIR, "schedule.json")
+CADENCE_FACTOR = 0.5    # Poll at half the median gap between published stories
+UNCHANGED_BACKOFF = 1.5 # Stretch the interval each time a poll brings nothing new
+
+_lock = threading.Lock()
+_schedule = None
+
+def _load():
+    global _schedule
+    if _schedule is None:
+        try:
+            with open(SCHEDULE_FILE, "r") as f:
+                _schedule = json.load(f)
+        except (OSError, ValueError):
+            _schedule = {}
+    return _schedule
+
+def _save():
+    try:
+        os.makedirs(FEED_STORE_DIR, exist_ok=True)
+        # Unique temp name: the poller and the UI process may save at the same time
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(SCHEDULE_FILE), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(_schedule, f)
+            os.replace(tmp_path, SCHEDULE_FILE)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+    except Exception as e:
+        print(f"[Scheduler] Could not persist schedule: {e}")
+
+def _clamp(interval):
+    return max(MIN_POLL_INTERVAL, min(MAX_POLL_INTERVAL, interval))
+
+def _entry(name):
+    return _load().setdefault(name, {
+        'interval': POLL_INTERVAL,
+        'next_due': 0,
+        'failures': 0,
+        'fingerprint': None,
+        'last_polled': None,
+    })
+
+def publish_gap(timestamps):
+    """Median seconds between consecutive published stories, or None if unknown."""
+    stamps = sorted({t for t in timestamps if t}, reverse=True)
+    if len(stamps) < 2:
+        return None
+    return statistics.median(a - b for a, b in zip(stamps, stamps[1:]))
+
+def due_sources(feeds, now=None):
+    """The (name, url) pairs whose next poll is due."""
+    now = now or time.time()
+    with _lock:
+        return [(name, url) for name, url in feeds if _entry(name)['next_due'] <= now]
+
+def record_success(name, articles, now=None):
+    """Learn from a successful poll: follow publish cadence, back off if nothing changed."""
+    now = now or time.time()
+    fingerprint = sorted(a['link'] for a in articles)
+    with _lock:
+        entry = _entry(name)
+        if fingerprint == entry['fingerprint']:
+            entry['interval'] = _clamp(entry['interval'] * UNCHANGED_BACKOFF)
+        else:
+            gap = publish_gap([a['timestamp'] for a in articles])
+            entry['interval'] = _clamp(gap * CADENCE_FACTOR if gap else POLL_INTERVAL)
+        entry['fingerprint'] = fingerprint
+        entry['failures'] = 0
+        entry['last_polled'] = now
+        entry['next_due'] = now + entry['interval']
+        _save()
+
+def record_failure(name, now=None):
+    """Exponential backoff on consecutive failures."""
+    now = now or time.time()
+    with _lock:
+        entry = _entry(name)
+        entry['failures'] += 1
+        entry['interval'] = _clamp(POLL_INTERVAL * 2 ** entry['failures'])
+        entry['last_polled'] = now
+        entry['next_due'] = now + entry['interval']
+        _save()
+
+def report():
+    """Chosen interval and next due time for every scheduled source, soonest first."""
+    with _lock:
+        rows = [
+            {'source': name, 'interval': e['interval'], 'next_due': e['next_due'],
+             'failures': e['failures'], 'last_polled': e['last_polled']}
+            for name, e in _load().items()
+        ]
+    return sorted(rows, key=lambda r: r['next_due'])
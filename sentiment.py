@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config import CACHE_DIR, SENTIMENT_BACKEND, SENTIMENT_MEMO_SIZE, SENTIMENT_DB, SENTIMENT_DB_ROWS
+
+# Sentiment scoring with a two-level memo (in-process LRU + SQLite on disk)
+# keyed by text hash, a batch API, and two interchangeable backends:
+#   textblob - TextBlob's PatternAnalyzer (the original behaviour)
+#   lexicon  - the same Pattern lexicon, precompiled to a flat dict once and
+#              scored with a plain tokenizer, no TextBlob objects per text.
+
+LEXICON_CACHE = os.path.join(CACHE_DIR, "sentiment_lexicon.json")
+NEGATIONS = ("no", "not", "n't", "never")
+_TOKEN_RE = re.compile(r"n't|[\w'-]+|[^\w\s]")
+
+_lock = threading.Lock()
+_memo = OrderedDict()
+_db = None
+_lexicon = None
+
+# --- LABELS ---
+def classify(polarity):
+    """Map a polarity score to the (class, css, label) tuple used by the story badges."""
+    if polarity > 0.1: return "Positive", "badge-pos", "🟢 Good News"
+    elif polarity < -0.1: return "Negative", "badge-neg", "🔴 Crisis/Issue"
+    else: return "Neutral", "badge-neu", "⚪ Neutral"
+
+# --- BACKENDS ---
+def _textblob_polarity(text):
+    from textblob import TextBlob
+    return TextBlob(text).sentiment.polarity
+
+def load_lexicon():
+    """word -> (polarity, intensity, is_modifier), compiled from TextBlob's lexicon on first use."""
+    global _lexicon
+    if _lexicon is not None:
+        return _lexicon
+    try:
+        with open(LEXICON_CACHE, "r") as f:
+            _lexicon = {w: tuple(v) for w, v in json.load(f).items()}
+        return _lexicon
+    except (OSError, ValueError):
+        pass
+
+    from textblob.en import sentiment as pattern_sentiment
+    pattern_sentiment.load()
+    lexicon = {}
+    for word, senses in dict.items(pattern_sentiment):
+        if None not in senses:
+            continue
+        polarity, _, intensity = senses[None]
+        lexicon[word] = (polarity, intensity, "RB" in senses)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(LEXICON_CACHE, "w") as f:
+            json.dump(lexicon, f)
+    except OSError as e:
+        print(f"[Sentiment] Could not cache lexicon: {e}")
+    _lexicon = lexicon
+    return _lexicon
+
+def _lexicon_polarity(text):
+    """Port of Pattern's assessment loop (modifiers, negation, '!') over the precompiled lexicon."""
+    lexicon = load_lexicon()
+    tokens = _TOKEN_RE.findall(text.lower().replace("n't", " n't"))
+    assessments = []  # [polarity, intensity, negated]
+    modifier = negation = None
+    for w in tokens:
+        known = lexicon.get(w)
+        if known:
+            p, i, is_modifier = known
+            if modifier is None:
+                assessments.append([p, i, False])
+            else:
+                assessments[-1][0] = max(-1.0, min(p * assessments[-1][1], 1.0))
+                assessments[-1][1] = i
+            if negation is not None:
+                assessments[-1][1] = 1.0 / assessments[-1][1]
+                assessments[-1][2] = True
+            modifier = w if is_modifier else None
+            negation = w if w in NEGATIONS else None
+        else:
+            if w in NEGATIONS:
+                negation = w
+            elif negation and len(w.strip("'")) > 1:
+                negation = None
+            if negation is not None and modifier is not None and modifier.endswith("ly"):
+                assessments[-1][2] = True
+                negation = None
+            elif modifier and len(w) > 2:
+                modifier = None
+            if w == "!" and assessments:
+                assessments[-1][0] = max(-1.0, min(assessments[-1][0] * 1.25, 1.0))
+    if not assessments:
+        return 0.0
+    return sum(p * -0.5 if negated else p for p, _, negated in assessments) / len(assessments)
+
+BACKENDS = {
+    "textblob": _textblob_polarity,
+    "lexicon": _lexicon_polarity,
+}
+
+def warm(backend=SENTIMENT_BACKEND):
+    """Load the backend's lexicon (and TextBlob, if it uses it) ahead of the first real score."""
+    BACKENDS[backend]("warm up")
+
+# --- MEMO ---
+def _text_key(text, backend):
+    return backend + ":" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def _get_db():
+    global _db
+    if _db is None:
+        os.makedirs(os.path.dirname(SENTIMENT_DB) or ".", exist_ok=True)
+        _db = sqlite3.connect(SENTIMENT_DB, check_same_thread=False)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.execute("CREATE TABLE IF NOT EXISTS memo (key TEXT PRIMARY KEY, polarity REAL, last_used REAL NOT NULL DEFAULT 0)")
+        # Memos written before pruning existed: their rows count as oldest
+        if "last_used" not in {row[1] for row in _db.execute("PRAGMA table_info(memo)")}:
+            _db.execute("ALTER TABLE memo ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+        _db.execute("CREATE INDEX IF NOT EXISTS idx_memo_last_used ON memo (last_used)")
+    return _db
+
+def _prune(db):
+    """Delete the least recently used rows beyond SENTIMENT_DB_ROWS."""
+    excess = db.execute("SELECT COUNT(*) FROM memo").fetchone()[0] - SENTIMENT_DB_ROWS
+    if excess > 0:
+        db.execute("DELETE FROM memo WHERE key IN (SELECT key FROM memo ORDER BY last_used LIMIT ?)", (excess,))
+
+def _memo_put(key, polarity):
+    _memo[key] = polarity
+    _memo.move_to_end(key)
+    if len(_memo) > SENTIMENT_MEMO_SIZE:
+        _memo.popitem(last=False)
+
+def polarity_batch(texts, backend=SENTIMENT_BACKEND):
+    """Polarity for each text; memo hits skip scoring, misses are scored once per distinct text."""
+    keys = [_text_key(t, backend) for t in texts]
+    found, from_db = {}, []
+    with _lock:
+        for key in keys:
+            if key in _memo:
+                _memo.move_to_end(key)
+                found[key] = _memo[key]
+        missing = list({k for k in keys if k not in found})
+        if missing:
+            try:
+                db = _get_db()
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    rows = db.execute(f"SELECT key, polarity FROM memo WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+                    for key, polarity in rows:
+                        found[key] = polarity
+                        from_db.append(key)
+                        _memo_put(key, polarity)
+            except sqlite3.Error as e:
+                print(f"[Sentiment] Memo read failed: {e}")
+
+    # Score outside the lock so worker threads do not serialize on it
+    scorer = BACKENDS[backend]
+    fresh = {}
+    for text, key in zip(texts, keys):
+        if key in found or key in fresh:
+            continue
+        try:
+            fresh[key] = scorer(text)
+        except Exception:
+            fresh[key] = 0.0
+
+    # Rows served from disk are marked used (hits on the in-process LRU were
+    # marked when they were loaded or written); new rows may push out old ones
+    if fresh or from_db:
+        now = time.time()
+        with _lock:
+            for key, polarity in fresh.items():
+                _memo_put(key, polarity)
+            try:
+                db = _get_db()
+                with db:
+                    db.executemany("UPDATE memo SET last_used = ? WHERE key = ?", [(now, key) for key in from_db])
+                    db.executemany("INSERT OR REPLACE INTO memo (key, polarity, last_used) VALUES (?, ?, ?)",
+                                   [(key, polarity, now) for key, polarity in fresh.items()])
+                    if fresh:
+                        _prune(db)
+            except sqlite3.Error as e:
+                print(f"[Sentiment] Memo write failed: {e}")
+        found.update(fresh)
+    return [found[key] for key in keys]
+
+def score_batch(texts, backend=SENTIMENT_BACKEND):
+    """(class, css, label) tuple for each text."""
+    return [classify(p) for p in polarity_batch(texts, backend)]
+
+def score(text, backend=SENTIMENT_BACKEND):
+    return score_batch([text], backend)[0]
+
+def score_articles(articles, backend=SENTIMENT_BACKEND):
+    """Set sentiment_class / sentiment_label on article dicts in one batch call."""
+    results = score_batch([a['title'] + " " + a['summary'] for a in articles], backend)
+    for article, (_, sent_class, sent_label) in zip(articles, results):
+        article['sentiment_class'] = sent_class
+        article['sentiment_label'] = sent_label
+    return articles
@@ -1,124 +1,156 @@
-import requests
-import subprocess
 import concurrent.futures
-import feedparser
 import streamlit as st
-import re
-import cloudscraper
-from google import genai
-from utils import get_sentiment, extract_image_url, format_display_date, get_relative_time, parse_date
+import time
+import fetch_strategy
+import llm
+import newsletter
+import pipeline
+import telemetry
+from article import Article
+from article_store import ingest_articles
+from async_fetch import scan_feeds, stream_feeds
+from config import FETCH_BACKEND
+from entry_index import RefreshDiff
+from sentiment import score_articles
 
 # --- HELPERS ---
-def fetch_content_robust(url):
+def fetch_content_robust(url, report=None):
     """
     Attempts to fetch content/RSS XML from a URL using multiple methods 
     to bypass bot protection (Cloudflare, etc.).
+    Sends conditional headers from the on-disk HTTP cache and serves the
+    cached body when the publisher answers 304 Not Modified. Methods are
+    tried in the order that last worked for the host and hedged after a
+    short delay (see fetch_strategy). `report`, if given, is filled with the
+    method, HTTP status and error of the fetch.
     """
-    # Method 1: Cloudscraper (Best for Cloudflare)
-    try:
-        scraper = cloudscraper.create_scraper()
-        response = scraper.get(url, timeout=15)
-        if response.status_code == 200:
-            return response.content
-    except Exception as e:
-        print(f"[Cloudscraper] Failed for {url}: {e}")
-
-    # Method 2: Requests (Standard)
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36",
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            return response.content
-    except Exception as e:
-        print(f"[Requests] Failed for {url}: {e}")
-
-    # Method 3: Curl (Last Resort)
-    try:
-        result = subprocess.run(
-            ["curl", "-L", "-A", "Mozilla/5.0", url],
-            capture_output=True,
-            timeout=15
-        )
-        if result.returncode == 0 and result.stdout:
-            return result.stdout
-    except Exception as e:
-        print(f"[Curl] Failed for {url}: {e}")
-        
-    return None
+    body, _ = fetch_strategy.fetch(url, report=report)
+    return body
 
 # --- GEMINI AI ---
+# Calls go through llm.py: shared client, response cache, rate limit and retries.
+def post_prompt(story):
+    return f"Write a punchy LinkedIn caption (under 100 words) for: {story.title} from {story.source}. Summary: {story.summary}"
+
 def generate_single_post(api_key, story):
     try:
-        client = genai.Client(api_key=api_key)
-        prompt = f"Write a punchy LinkedIn caption (under 100 words) for: {story['title']} from {story['source']}. Summary: {story['summary']}"
-        response = client.models.generate_content(model="gemini-2.5-flash", contents=prompt)
-        return response.text
+        return llm.generate(api_key, post_prompt(story))
     except Exception as e: return f"Error: {str(e)}"
 
+def stream_single_post(api_key, story):
+    """Yield the caption as it is generated (for st.write_stream)."""
+    return llm.stream(api_key, post_prompt(story))
+
+def draft_posts(api_key, stories):
+    """Captions for several stories in parallel: {link: text}."""
+    return dict(zip([s.link for s in stories], llm.generate_many(api_key, [post_prompt(s) for s in stories])))
+
 def generate_newsletter(api_key, stories):
     try:
-        client = genai.Client(api_key=api_key)
-        stories_text = ""
-        for i, s in enumerate(stories):
-            stories_text += f"{i+1}. {s['title']} ({s['source']}): {s['summary'][:150]}...\n"
-        prompt = f"Write a Morning Briefing newsletter based on these stories:\n{stories_text}\nFormat: Intro, Bullet points, Closing thought."
-        response = client.models.generate_content(model="gemini-2.5-flash", contents=prompt)
-        return response.text
+        return newsletter.generate_newsletter(api_key, stories)
     except Exception as e: return f"Error: {str(e)}"
 
 # --- DATA FETCHING ---
-@st.cache_data(ttl=300, show_spinner=False)
-def fetch_feed_data(url, source_name):
+def _score(articles):
+    with pipeline.stage("sentiment"):
+        score_articles(articles)
+
+def load_feed_articles(url, source_name):
+    """
+    Fetch and parse one feed and archive it in the article store. Uncached; used
+    by the background poller. Every call is recorded in the source's telemetry.
+    The fetch runs in this thread; parsing and enrichment go to the process pool
+    (pipeline.py) and the result is ingested back here.
+    """
+    started = time.monotonic()
+    report = {}
+    nbytes, parse_error = 0, None
     try:
+        diff = RefreshDiff(source_name)
         # Robust fetch
-        content = fetch_content_robust(url)
+        with pipeline.stage("fetch"):
+            content = fetch_content_robust(url, report)
         
         if content:
-             feed = feedparser.parse(content)
+             nbytes = len(content)
+             parsed = pipeline.parse(content, source_name, diff.known())
         else:
              # Last resort: let feedparser try (though it likely failed already)
-             feed = feedparser.parse(url)
+             import feedparser
+             with pipeline.stage("fetch"):
+                 feed = feedparser.parse(url)
+             if feed.entries: report['method'] = 'feedparser'
+             with pipeline.stage("parse"):
+                 parsed = pipeline.parse_entries(feed, source_name, diff.known())
 
-        if hasattr(feed, 'bozo_exception') and feed.bozo_exception:
+        if parsed['parse_error']:
              # Log warning but attempt to parse anyway
-             print(f"Warning parsing {url}: {feed.bozo_exception}")
-
-        articles = []
-        for entry in feed.entries[:10]: 
-            summary = entry.get('summary', 'No summary.')
-            summary = re.sub('<[^<]+?>', '', summary) 
-            if "Guardian" in source_name and "<" in summary: summary = summary.split("<")[0]
-            
-            sent_score, sent_class, sent_label = get_sentiment(entry.title + " " + summary)
+             parse_error = parsed['parse_error']
+             print(f"Warning parsing {url}: {parse_error}")
 
-            articles.append({
-                'title': entry.title,
-                'link': entry.link,
-                'summary': summary,
-                'published_display': format_display_date(entry),
-                'relative_time': get_relative_time(entry),
-                'timestamp': parse_date(entry),
-                'source': source_name,
-                'image': extract_image_url(entry),
-                'sentiment_class': sent_class,
-                'sentiment_label': sent_label
-            })
+        articles, fresh = [], []
+        for key, digest, article in parsed['entries']:
+            _, _, stored = diff.match(key, digest)
+            if article is None:
+                # Seen before and unchanged: reuse the stored article
+                article = stored
+            else:
+                fresh.append(article)
+            diff.keep(key, digest, article)
+            articles.append(article)
+        # Cluster new/changed entries against the archive (near-duplicates share a label)
+        with pipeline.stage("ingest"):
+            ingest_articles(articles, fresh, _score)
+        diff.commit()
+        telemetry.record(source_name, time.monotonic() - started, report.get('method'), report.get('status'),
+                         nbytes, report.get('error'), parsed['total'], parse_error)
         return articles
     except Exception as e:
         print(f"Error fetching {url}: {e}")
+        telemetry.record(source_name, time.monotonic() - started, None, report.get('status'), nbytes, str(e), 0, parse_error)
         return []
 
-def fetch_all_feeds(unique_feeds):
+# One shared, immutable result per feed for every session (cache_data would
+# hand each caller its own unpickled copy)
+@st.cache_resource(ttl=300, show_spinner=False)
+def fetch_feed_data(url, source_name):
+    return tuple(Article.from_dict(a) for a in load_feed_articles(url, source_name))
+
+def fetch_all_feeds(unique_feeds, backend=FETCH_BACKEND, stream=False):
+    """
+    Fetch and archive every (name, url) feed; returns all stories. With
+    stream=True, returns a generator of (name, stories, status) per source
+    in completion order instead, status being {'status': ok|empty|error|
+    budget_exceeded|deadline, 'elapsed', 'count'}.
+    """
+    if stream:
+        return _stream_feeds(unique_feeds, backend)
+    if backend == "async":
+        all_stories, statuses = scan_feeds(unique_feeds, fetch_feed_data)
+        for name, status in statuses.items():
+            if status['status'] != 'ok': print(f"[Scan] {name}: {status['status']} after {status['elapsed']:.1f}s")
+        return all_stories
+
     all_stories = []
+    for _, stories, _ in _stream_feeds(unique_feeds, backend):
+        all_stories.extend(stories)
+    return all_stories
+
+def _stream_feeds(unique_feeds, backend):
+    if backend == "async":
+        yield from stream_feeds(unique_feeds, fetch_feed_data)
+        return
+
+    started = time.monotonic()
     with concurrent.futures.ThreadPoolExecutor() as executor:
         future_to_url = {executor.submit(fetch_feed_data, url, name): name for name, url in unique_feeds}
         
         for future in concurrent.futures.as_completed(future_to_url):
+            name = future_to_url[future]
             try:
                 stories = future.result()
-                all_stories.extend(stories)
+                status = {'status': 'ok' if stories else 'empty', 'count': len(stories)}
             except Exception as e:
-                st.error(f"Error fetching feed: {e}")
-    return all_stories
+                print(f"Error fetching feed {name}: {e}")
+                stories, status = [], {'status': 'error', 'count': 0, 'error': str(e)}
+            yield name, stories, {**status, 'elapsed': time.monotonic() - started}
@@ -1,41 +1,166 @@
 import json
 import os
+import sqlite3
+import threading
+import time
+from article import Article
+from config import USER_DB, DEFAULT_USER, LEGACY_FAVORITES_FILE, LEGACY_SAVED_STORIES_FILE
 
-DB_FILE = "favorites.json"
-SAVED_STORIES_FILE = "saved_stories.json"
+# Saved stories and favorites in SQLite (WAL): one row per story, so saving or
+# removing a story is a single-row transaction whatever the collection size.
+# Every write runs in BEGIN IMMEDIATE, which serialises writers across
+# sessions and processes; a crash mid-write leaves the previous commit intact.
+# Rows are namespaced per user. favorites.json / saved_stories.json are
+# imported once into DEFAULT_USER's namespace.
 
-def load_favorites():
-    """Load favorites from local JSON file."""
-    if not os.path.exists(DB_FILE):
-        return []
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS saved_stories (
+    user TEXT NOT NULL,
+    link TEXT NOT NULL,
+    story TEXT NOT NULL,
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (user, link)
+);
+CREATE INDEX IF NOT EXISTS idx_saved_stories_order ON saved_stories (user, saved_at);
+CREATE TABLE IF NOT EXISTS favorites (
+    user TEXT NOT NULL,
+    source TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (user, source)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_lock = threading.Lock()
+_db = None
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT on the shared connection, rolled back on error."""
+
+    def __enter__(self):
+        _lock.acquire()
+        try:
+            self.db = _get_db()
+            self.db.execute("BEGIN IMMEDIATE")
+        except Exception:
+            _lock.release()
+            raise
+        return self.db
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            _lock.release()
+
+def _get_db():
+    global _db
+    if _db is None:
+        os.makedirs(os.path.dirname(USER_DB) or ".", exist_ok=True)
+        db = sqlite3.connect(USER_DB, check_same_thread=False, timeout=30, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=FULL")  # User data: a commit survives power loss, not just a crash
+        db.executescript(SCHEMA)
+        _migrate_json(db)
+        _db = db
+    return _db
+
+def _read_json(path, default):
+    if not os.path.exists(path):
+        return default
     try:
-        with open(DB_FILE, "r") as f:
+        with open(path, "r") as f:
             return json.load(f)
-    except:
+    except Exception as e:
+        print(f"[Storage] Could not import {path}: {e}")
+        return default
+
+def _migrate_json(db):
+    """One-time import of the JSON files; the marker makes other processes skip it."""
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        if db.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone() is None:
+            favorites = _read_json(LEGACY_FAVORITES_FILE, [])
+            stories = _read_json(LEGACY_SAVED_STORIES_FILE, {})
+            db.executemany("INSERT OR IGNORE INTO favorites (user, source, position) VALUES (?, ?, ?)",
+                           [(DEFAULT_USER, source, i) for i, source in enumerate(favorites)])
+            now = time.time()
+            db.executemany("INSERT OR IGNORE INTO saved_stories (user, link, story, saved_at) VALUES (?, ?, ?, ?)",
+                           [(DEFAULT_USER, link, json.dumps(story), now + i * 1e-6) for i, (link, story) in enumerate(stories.items())])
+            db.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)", (str(now),))
+            if favorites or stories:
+                print(f"[Storage] Imported {len(favorites)} favorites and {len(stories)} saved stories into '{DEFAULT_USER}'")
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+
+# --- FAVORITES ---
+def load_favorites(user=DEFAULT_USER):
+    """Favorite source names, in the order they were picked."""
+    try:
+        with _lock:
+            rows = _get_db().execute("SELECT source FROM favorites WHERE user = ? ORDER BY position", (user,)).fetchall()
+        return [source for (source,) in rows]
+    except sqlite3.Error as e:
+        print(f"Error loading favorites: {e}")
         return []
 
-def save_favorites(favorites_list):
-    """Save favorites list to local JSON file."""
+def save_favorites(favorites_list, user=DEFAULT_USER):
+    """Replace the favorites list."""
     try:
-        with open(DB_FILE, "w") as f:
-            json.dump(favorites_list, f)
-    except Exception as e:
+        with _Transaction() as db:
+            db.execute("DELETE FROM favorites WHERE user = ?", (user,))
+            db.executemany("INSERT INTO favorites (user, source, position) VALUES (?, ?, ?)",
+                           [(user, source, i) for i, source in enumerate(dict.fromkeys(favorites_list))])
+    except sqlite3.Error as e:
         print(f"Error saving favorites: {e}")
 
-def load_saved_stories():
-    """Load saved stories from local JSON file."""
-    if not os.path.exists(SAVED_STORIES_FILE):
-        return {}
+# --- SAVED STORIES ---
+def load_saved_stories(user=DEFAULT_USER):
+    """{link: Article}, oldest save first."""
     try:
-        with open(SAVED_STORIES_FILE, "r") as f:
-            return json.load(f)
-    except:
+        with _lock:
+            rows = _get_db().execute("SELECT link, story FROM saved_stories WHERE user = ? ORDER BY saved_at", (user,)).fetchall()
+        return {link: Article.from_dict(json.loads(story)) for link, story in rows}
+    except (sqlite3.Error, ValueError, TypeError) as e:
+        print(f"Error loading stories: {e}")
         return {}
 
-def save_saved_stories(stories_dict):
-    """Save stories dictionary to local JSON file."""
+def save_story(story, user=DEFAULT_USER):
+    """Add (or refresh) one saved Article."""
     try:
-        with open(SAVED_STORIES_FILE, "w") as f:
-            json.dump(stories_dict, f)
-    except Exception as e:
+        with _Transaction() as db:
+            db.execute("INSERT INTO saved_stories (user, link, story, saved_at) VALUES (?, ?, ?, ?) "
+                       "ON CONFLICT(user, link) DO UPDATE SET story = excluded.story",
+                       (user, story.link, json.dumps(story.to_dict()), time.time()))
+    except sqlite3.Error as e:
+        print(f"Error saving story: {e}")
+
+def remove_story(link, user=DEFAULT_USER):
+    try:
+        with _Transaction() as db:
+            db.execute("DELETE FROM saved_stories WHERE user = ? AND link = ?", (user, link))
+    except sqlite3.Error as e:
+        print(f"Error removing story: {e}")
+
+def save_saved_stories(stories_dict, user=DEFAULT_USER):
+    """
+    Make the stored collection equal stories_dict. Only rows that differ are
+    written; prefer save_story/remove_story for single toggles.
+    """
+    try:
+        with _Transaction() as db:
+            stored = {link: story for link, story in db.execute("SELECT link, story FROM saved_stories WHERE user = ?", (user,))}
+            gone = [(user, link) for link in stored if link not in stories_dict]
+            db.executemany("DELETE FROM saved_stories WHERE user = ? AND link = ?", gone)
+            now = time.time()
+            changed = []
+            for i, (link, story) in enumerate(stories_dict.items()):
+                encoded = json.dumps(story.to_dict())
+                if stored.get(link) != encoded:
+                    changed.append((user, link, encoded, now + i * 1e-6))
+            db.executemany("INSERT INTO saved_stories (user, link, story, saved_at) VALUES (?, ?, ?, ?) "
+                           "ON CONFLICT(user, link) DO UPDATE SET story = excluded.story", changed)
+    except sqlite3.Error as e:
         print(f"Error saving stories: {e}")
@@ -0,0 +1,67 @@
+import re
+import unicodedata
+from config import AFRICAN_COUNTRIES, COUNTRY_ALIASES
+
+# Ingest-time country tagger. Every country name, alias and demonym is folded
+# into one compiled, word-bounded regex built from a character trie, so tagging
+# a story is a single pass and the UI filter becomes a set/index lookup.
+
+def _fold(text):
+    """Strip diacritics and normalise apostrophes so "Côte d’Ivoire" == "Cote d'Ivoire"."""
+    text = text.replace("’", "'").replace("‘", "'")
+    if text.isascii():
+        return text
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+def _trie_pattern(surfaces):
+    """Regex for a set of strings, factored into a character trie so matching is not a linear scan of alternatives."""
+    trie = {}
+    for surface in surfaces:
+        node = trie
+        for char in surface:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node):
+        if list(node) == [""]:
+            return ""
+        optional = "" in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if optional:
+            body = "(?:" + body + ")?"
+        return body
+    return render(trie)
+
+def _build():
+    surface_to_countries = {}
+    acronyms = set()
+    for country in AFRICAN_COUNTRIES:
+        for surface in [country] + COUNTRY_ALIASES.get(country, []):
+            # Acronyms (DRC, CAR) only match in capitals so "car" stays a car
+            if surface.isupper() and len(surface) <= 4:
+                acronyms.add(surface)
+            surface_to_countries.setdefault(_fold(surface).lower(), set()).add(country)
+
+    words = _trie_pattern(s for s in surface_to_countries if s.upper() not in acronyms)
+    caps = "|".join(re.escape(a) for a in sorted(acronyms, key=len, reverse=True))
+    # Trie alternation is greedy per character, so the longest name wins ("South Sudan" over "South")
+    regex = re.compile(r"(?<!\w)(?:(?-i:" + caps + ")|" + words + r")(?!\w)", re.IGNORECASE)
+    return regex, surface_to_countries
+
+_REGEX, _SURFACES = _build()
+
+def tag_countries(*texts):
+    """Sorted list of countries mentioned (by name, alias or demonym) in any of the texts."""
+    found = set()
+    for text in texts:
+        if not text:
+            continue
+        for match in _REGEX.finditer(_fold(text)):
+            found.update(_SURFACES[match.group(0).lower()])
+    return sorted(found)
+
+def tag_article(article):
+    """Set article['countries'] from its title, summary and source name."""
+    article['countries'] = tag_countries(article.get('title'), article.get('summary'), article.get('source'))
+    return article
@@ -0,0 +1,172 @@
+"""
+Per-source fetch telemetry. The ingestion path (poller or inline scan) records
+every feed refresh: latency, payload bytes, the fetch method that served it,
+HTTP status, feedparser (bozo) errors and entry count. Aggregates are kept in
+SQLite so the app's Source Health page sees what the poller measured.
+
+    python telemetry.py          # print the metrics in Prometheus text format
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from config import TELEMETRY_DB, LATENCY_BUCKETS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS source_stats (
+    source TEXT PRIMARY KEY,
+    fetches INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    parse_errors INTEGER NOT NULL DEFAULT 0,
+    bytes_total INTEGER NOT NULL DEFAULT 0,
+    entries_total INTEGER NOT NULL DEFAULT 0,
+    latency_sum REAL NOT NULL DEFAULT 0,
+    latency_buckets TEXT NOT NULL DEFAULT '[]',
+    methods TEXT NOT NULL DEFAULT '{}',
+    statuses TEXT NOT NULL DEFAULT '{}',
+    last_fetch REAL,
+    last_latency REAL,
+    last_bytes INTEGER,
+    last_method TEXT,
+    last_status INTEGER,
+    last_entries INTEGER,
+    last_error TEXT,
+    last_parse_error TEXT
+);
+"""
+
+_lock = threading.Lock()
+_db = None
+
+def _get_db():
+    global _db
+    if _db is None:
+        os.makedirs(os.path.dirname(TELEMETRY_DB) or ".", exist_ok=True)
+        _db = sqlite3.connect(TELEMETRY_DB, check_same_thread=False, timeout=30, isolation_level=None)
+        _db.row_factory = sqlite3.Row
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.executescript(SCHEMA)
+    return _db
+
+def _bucket(latency):
+    """Index of the histogram bucket for latency; len(LATENCY_BUCKETS) is +Inf."""
+    for i, bound in enumerate(LATENCY_BUCKETS):
+        if latency <= bound:
+            return i
+    return len(LATENCY_BUCKETS)
+
+# --- RECORD ---
+def record(source, latency, method=None, status=None, nbytes=0, error=None, entries=0, parse_error=None):
+    """Add one refresh of source. A refresh without a body (method None) counts as a failure."""
+    try:
+        with _lock:
+            db = _get_db()
+            # IMMEDIATE: the poller and an inline scan may update the same row
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute("SELECT latency_buckets, methods, statuses FROM source_stats WHERE source = ?", (source,)).fetchone()
+                buckets = json.loads(row['latency_buckets']) if row else []
+                buckets += [0] * (len(LATENCY_BUCKETS) + 1 - len(buckets))
+                buckets[_bucket(latency)] += 1
+                methods = json.loads(row['methods']) if row else {}
+                methods[method or "none"] = methods.get(method or "none", 0) + 1
+                statuses = json.loads(row['statuses']) if row else {}
+                statuses[str(status or 0)] = statuses.get(str(status or 0), 0) + 1
+                db.execute(
+                    "INSERT INTO source_stats (source) VALUES (?) ON CONFLICT(source) DO NOTHING", (source,))
+                db.execute(
+                    "UPDATE source_stats SET fetches = fetches + 1, failures = failures + ?, parse_errors = parse_errors + ?, "
+                    "bytes_total = bytes_total + ?, entries_total = entries_total + ?, latency_sum = latency_sum + ?, "
+                    "latency_buckets = ?, methods = ?, statuses = ?, last_fetch = ?, last_latency = ?, last_bytes = ?, "
+                    "last_method = ?, last_status = ?, last_entries = ?, last_error = ?, last_parse_error = ? WHERE source = ?",
+                    (int(method is None), int(parse_error is not None), nbytes, entries, latency,
+                     json.dumps(buckets), json.dumps(methods), json.dumps(statuses), time.time(), latency, nbytes,
+                     method, status, entries, error, parse_error, source),
+                )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+    except sqlite3.Error as e:
+        print(f"[Telemetry] Could not record {source}: {e}")
+
+# --- READ ---
+def _quantile(buckets, q):
+    """Upper bound of the bucket holding the q-quantile (None when it is in +Inf)."""
+    total = sum(buckets)
+    if not total:
+        return None
+    seen = 0
+    for i, count in enumerate(buckets):
+        seen += count
+        if seen >= q * total:
+            return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else None
+    return None
+
+def snapshot():
+    """One dict per source with the raw counters plus mean/p50/p95 latency and failure rate."""
+    with _lock:
+        rows = _get_db().execute("SELECT * FROM source_stats ORDER BY source").fetchall()
+    sources = []
+    for row in rows:
+        stats = dict(row)
+        for key in ('latency_buckets', 'methods', 'statuses'):
+            stats[key] = json.loads(stats[key])
+        fetches = stats['fetches'] or 1
+        stats['mean_latency'] = stats['latency_sum'] / fetches
+        stats['p50_latency'] = _quantile(stats['latency_buckets'], 0.5)
+        stats['p95_latency'] = _quantile(stats['latency_buckets'], 0.95)
+        stats['failure_rate'] = stats['failures'] / fetches
+        sources.append(stats)
+    return sources
+
+def reset():
+    with _lock:
+        _get_db().execute("DELETE FROM source_stats")
+
+# --- PROMETHEUS EXPORT ---
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def export():
+    """All metrics in the Prometheus text exposition format."""
+    sources = snapshot()
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            rendered = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{suffix}{{{rendered}}} {value}")
+
+    histogram = []
+    for s in sources:
+        cumulative = 0
+        for bound, count in zip(list(LATENCY_BUCKETS) + ["+Inf"], s['latency_buckets']):
+            cumulative += count
+            histogram.append(("_bucket", {'source': s['source'], 'le': bound}, cumulative))
+        histogram.append(("_sum", {'source': s['source']}, s['latency_sum']))
+        histogram.append(("_count", {'source': s['source']}, s['fetches']))
+    metric("radar_fetch_duration_seconds", "histogram", "Feed refresh latency.", histogram)
+    metric("radar_fetch_failures_total", "counter", "Refreshes that got no feed body.",
+           [("", {'source': s['source']}, s['failures']) for s in sources])
+    metric("radar_fetch_bytes_total", "counter", "Feed payload bytes received.",
+           [("", {'source': s['source']}, s['bytes_total']) for s in sources])
+    metric("radar_fetch_method_total", "counter", "Refreshes served by each fetch method.",
+           [("", {'source': s['source'], 'method': m}, n) for s in sources for m, n in sorted(s['methods'].items())])
+    metric("radar_fetch_status_total", "counter", "Refreshes by final HTTP status (0: no response).",
+           [("", {'source': s['source'], 'status': code}, n) for s in sources for code, n in sorted(s['statuses'].items())])
+    metric("radar_parse_errors_total", "counter", "Feeds feedparser flagged as malformed (bozo).",
+           [("", {'source': s['source']}, s['parse_errors']) for s in sources])
+    metric("radar_feed_entries_total", "counter", "Entries parsed.",
+           [("", {'source': s['source']}, s['entries_total']) for s in sources])
+    metric("radar_feed_entries", "gauge", "Entries in the latest refresh.",
+           [("", {'source': s['source']}, s['last_entries'] or 0) for s in sources])
+    metric("radar_last_fetch_timestamp_seconds", "gauge", "Time of the latest refresh.",
+           [("", {'source': s['source']}, s['last_fetch'] or 0) for s in sources])
+    return "\n".join(lines) + "\n"
+
+if __name__ == "__main__":
+    print(export(), end="")
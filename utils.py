@@ -1,16 +1,12 @@
 import time
 import re
 from datetime import datetime
-from textblob import TextBlob
+import sentiment
 
 # --- HELPER FUNCTIONS ---
 def get_sentiment(text):
     try:
-        blob = TextBlob(text)
-        score = blob.sentiment.polarity
-        if score > 0.1: return "Positive", "badge-pos", "🟢 Good News"
-        elif score < -0.1: return "Negative", "badge-neg", "🔴 Crisis/Issue"
-        else: return "Neutral", "badge-neu", "⚪ Neutral"
+        return sentiment.score(text)
     except: return "Neutral", "badge-neu", "⚪ Neutral"
 
 def extract_image_url(entry):
@@ -33,15 +29,17 @@ def format_display_date(entry):
         return time.strftime("%d %b • %H:%M", entry.published_parsed)
     return "Recent"
 
+def relative_time_from_ts(published_ts):
+    if not published_ts: return ""
+    delta_seconds = time.time() - published_ts
+    if delta_seconds < 60: return "Just now"
+    elif delta_seconds < 3600: return f"{int(delta_seconds/60)}m ago"
+    elif delta_seconds < 86400: return f"{int(delta_seconds/3600)}h ago"
+    else: return f"{int(delta_seconds/86400)}d ago"
+
 def get_relative_time(entry):
     if hasattr(entry, 'published_parsed') and entry.published_parsed:
-        published_ts = time.mktime(entry.published_parsed)
-        now_ts = time.time()
-        delta_seconds = now_ts - published_ts
-        if delta_seconds < 60: return "Just now"
-        elif delta_seconds < 3600: return f"{int(delta_seconds/60)}m ago"
-        elif delta_seconds < 86400: return f"{int(delta_seconds/3600)}h ago"
-        else: return f"{int(delta_seconds/86400)}d ago"
+        return relative_time_from_ts(time.mktime(entry.published_parsed))
     return ""
 
 def parse_date(entry):
@@ -0,0 +1,54 @@
+import threading
+from collections import OrderedDict
+import article_store
+from article import Article
+from config import ITEMS_PER_PAGE, VIEW_CACHE_SIZE
+
+# Cached view layer for the story list. A view is one filter combination
+# (sources, query, countries, dates, collapse); its total and each page the
+# user visits are read from the store once and reused across reruns until the
+# store changes, so paging, "Add to Brief" and "Save" never re-query or re-sort.
+# Views are module-level, so all sessions share them; pages hold Article
+# records, with the per-query extras (search snippet, cluster size) kept aside.
+
+_views = OrderedDict()
+_lock = threading.Lock()
+
+class StoryView:
+    def __init__(self, key, version):
+        self.key = key
+        self.version = version
+        self.pages = {}
+        self.extras = {}  # link -> {'snippet', 'cluster_size'} for stories on the visited pages
+        sources, search, countries, since, until, collapse = key
+        self.total = article_store.count_articles(sources, search, countries, since, until, collapse=collapse)
+
+    def page(self, number):
+        """Articles on page `number` (0-based), fetched on first visit as a LIMIT/OFFSET top-N query."""
+        stories = self.pages.get(number)
+        if stories is None:
+            sources, search, countries, since, until, collapse = self.key
+            rows = article_store.query_articles(
+                sources, search, countries, since, until,
+                limit=ITEMS_PER_PAGE, offset=number * ITEMS_PER_PAGE, collapse=collapse)
+            for row in rows:
+                if row.get('snippet') or row.get('cluster_size', 1) > 1:
+                    self.extras[row['link']] = {'snippet': row.get('snippet'), 'cluster_size': row.get('cluster_size', 1)}
+            stories = self.pages[number] = [Article.from_dict(row) for row in rows]
+        return stories
+
+def story_view(sources, search=None, countries=None, since=None, until=None, collapse=False):
+    """The (cached) StoryView for a filter combination; rebuilt when the store has changed."""
+    key = (tuple(sorted(sources)), (search or "").strip(), tuple(sorted(countries or ())), since, until, collapse)
+    version = article_store.store_version()
+    with _lock:
+        view = _views.get(key)
+        if view is not None and view.version == version:
+            _views.move_to_end(key)
+            return view
+    view = StoryView(key, version)
+    with _lock:
+        _views[key] = view
+        while len(_views) > VIEW_CACHE_SIZE:
+            _views.popitem(last=False)
+    return view
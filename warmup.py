@@ -0,0 +1,58 @@
+"""
+Background warm-up for the lazily imported dependencies. feedparser,
+cloudscraper, Pillow, the sentiment lexicon and the Gemini SDK are only
+imported where they are first used, and the parse worker processes are only
+started by the first feed, so a fresh process renders without them; start()
+then loads them on a daemon thread once the first page has been sent. The
+parse workers are left alone while a poller is alive: it does the parsing.
+
+    python warmup.py          # preload everything and print the time per step
+"""
+import importlib
+import threading
+import time
+import article_store
+import pipeline
+import sentiment
+from config import WARMUP
+
+# Scan path first, drafting last
+STEPS = [
+    ("feedparser", lambda: importlib.import_module("feedparser")),
+    ("cloudscraper", lambda: importlib.import_module("cloudscraper")),
+    ("Pillow", lambda: importlib.import_module("PIL.Image")),
+    ("sentiment", sentiment.warm),
+    ("parse pool", lambda: article_store.poller_alive() or pipeline.warm()),
+    ("google-genai", lambda: importlib.import_module("google.genai")),
+]
+
+_lock = threading.Lock()
+_thread = None
+timings = {}
+
+def preload():
+    """Run every warm-up step; returns {step: seconds}. Failures are printed and skipped."""
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            print(f"[Warm-up] {name} failed: {e}")
+            continue
+        timings[name] = time.perf_counter() - started
+    return timings
+
+def start():
+    """preload() on a background thread, once per process (no-op when RADAR_WARMUP=0)."""
+    global _thread
+    if not WARMUP:
+        return None
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=preload, daemon=True, name="warm-up")
+            _thread.start()
+        return _thread
+
+if __name__ == "__main__":
+    for name, seconds in preload().items():
+        print(f"{name:<14} {seconds * 1000:8.1f} ms")